@@ -20,6 +20,7 @@ load_dotenv()
 CONFIG: Dict[str, Any] = {
     "root_path": os.path.dirname(os.path.abspath(__file__)),
     "save_metadata": False,
+    "persist_while_running": False,
     "num_threads": 4,
     "saving_method": "numpy",
     "upload_to_s3": False,
@@ -98,7 +99,11 @@ def run_simulation(pumle_instance: Pumle) -> None:
         pumle_instance.pre_process()
         
         print("[INFO] Pre-process done. Starting simulations...")
-        pumle_instance.run_simulations()
+        if pumle_instance.config.get("persist_while_running"):
+            # Post-process and save each simulation as soon as it finishes
+            pumle_instance.run_and_persist()
+        else:
+            pumle_instance.run_simulations()
         
         print("[INFO] Simulations finished.")
     except ValueError as e:
@@ -114,10 +119,9 @@ def persist_data(pumle_instance: Pumle) -> None:
         return
         
     print("[INFO] Processing results...")
-    for conf in pumle_instance.configs:
-        sim_hash = conf["SimNums"]["sim_hash"]
-        result = pumle_instance.post_process(sim_hash)
-        pumle_instance.save_data(sim_hash, result)
+    pumle_instance.save_all(
+        conf["SimNums"]["sim_hash"] for conf in pumle_instance.configs
+    )
     
     print("[INFO] Data persisted successfully.")
 
@@ -169,7 +173,7 @@ def main() -> None:
         display_menu()
         choice = input("Select an option: ").strip()
         
-        start_time = time.time()
+        start_time = time.perf_counter()
         
         try:
             if choice == "1":
@@ -189,7 +193,8 @@ def main() -> None:
             print(f"[ERROR] An error occurred: {str(e)}")
         
         if choice in ["1", "2"]:
-            print(f"--- {time.time() - start_time:.2f} seconds ---")
+            elapsed = time.perf_counter() - start_time
+            print(f"--- {elapsed:.2f} seconds ({elapsed / 60:.2f} minutes) ---")
         
         input("Press Enter to continue...")
 
@@ -8,10 +8,10 @@ THREADS=${1:-4}
 # Create data_lake directory if it doesn't exist
 mkdir -p data_lake/staging
 
-# Compile simulation code
+# Compile simulation code; the g++ flags are shared with src/pumle/pumle.py
 echo "Compiling simulation code..."
 cd simulation
-g++ simulation.cpp -o simulationCompiled.out -fopenmp
+g++ simulation.cpp -o simulationCompiled.out $(cat compile_flags.txt)
 cd ..
 
 echo "Simulation compiled successfully"
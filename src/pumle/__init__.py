@@ -16,11 +16,17 @@ __version__ = "0.1.0"
 from .pumle import Pumle
 from .db import DBManager
 from .parameters import Parameters
+from .parameters_variation import ParametersVariation, ParameterVariationError
 from .mat_files import MatFiles
-from .tabular import Tabular
-from .paths import Paths
-from .cloud_storage import CloudStorage
-from .metadata import Metadata
+from .tabular import Tabular, TabularError
+from .paths import Paths, PathsError
+from .cloud_storage import CloudStorage, CloudStorageError
+from .metadata import Metadata, MetadataError
+from .sim_results_parser import (
+    SimResultsParser,
+    SimulationResults,
+    SimResultsParserError,
+)
 
 __all__ = [
     # Core components
@@ -37,9 +43,7 @@ __all__ = [
     "ParametersVariation",
     
     # Error classes
-    "DBError",
-    "ParameterError",
-    "MatFilesError",
+    "ParameterVariationError",
     "TabularError",
     "PathsError",
     "CloudStorageError",
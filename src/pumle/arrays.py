@@ -3,10 +3,11 @@ Array operations for PUMLE simulations.
 Handles data consolidation, storage, and cloud upload functionality.
 """
 
+import itertools
 import os
 import logging
 from pathlib import Path
-from typing import Tuple, List, Dict, Optional, Union, Any
+from typing import Tuple, List, Dict, Iterable, Optional, Union, Any
 from dataclasses import dataclass
 
 import numpy as np
@@ -33,6 +34,9 @@ class ArraysError(Exception):
 class Arrays:
     """Handles array operations for simulation data."""
     
+    # Rows allocated up front when the number of states is not known
+    INITIAL_ROW_CAPACITY = 16
+    
     def __init__(self, output_data_path: Union[str, Path]) -> None:
         """Initialize Arrays instance.
         
@@ -55,13 +59,15 @@ class Arrays:
 
     def consolidate_all_data(
         self, 
-        result: List[Dict[str, Any]]
+        result: Union[Iterable[Dict[str, Any]], Dict[str, Any]]
     ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
         """Consolidate multiple simulation results (states over time).
         
         Args:
-            result: List of processed state dictionaries, one per timestep,
-                    as returned by SimResultsParser.get_all().
+            result: Processed state dictionaries, one per timestep, as
+                    returned by SimResultsParser.get_all() or streamed by
+                    SimResultsParser.iter_all(); or the stacked arrays
+                    returned by SimResultsParser.get_stacked().
             
         Returns:
             Tuple of (pressure, brine_saturation, gas_saturation) 
@@ -70,81 +76,285 @@ class Arrays:
         Raises:
             ArraysError: If consolidation fails.
         """
-        if not result:
+        if isinstance(result, dict):
+            return self._consolidate_stacked(result)
+            
+        states = iter(result)
+        first_state = next(states, None)
+        if first_state is None:
             raise ArraysError("Input result list is empty, cannot consolidate.")
 
         try:
             # Get dimensions and total cell count from the first state's metadata
-            first_metadata = result[0].get("metadata", {})
+            first_metadata = first_state.get("metadata", {})
             dimensions = first_metadata.get("dimensions")
-            if not dimensions or len(dimensions) != 3:
+            if dimensions is None or len(dimensions) != 3:
                 raise ValueError("Missing or invalid dimensions in metadata")
             i, j, k = dimensions
             ncells_total = np.prod([i, j, k])
             
-            num_ts = len(result)
-            self.timestamps = num_ts # Store the number of timesteps
+            # States sharing one set of active cells are filled in a single
+            # vectorized assignment; otherwise they are filled one by one
+            filled = self._fill_stacked(result, ncells_total) if isinstance(result, list) else None
+            if filled is None:
+                # SimResultsParser.iter_all reports the number of states
+                num_states = first_metadata.get("n_states")
+                if num_states is None and isinstance(result, list):
+                    num_states = len(result)
+                filled = self._fill_rows(
+                    itertools.chain([first_state], states), ncells_total, num_states
+                )
+            p_all, sw_all, sg_all = filled
 
-            # Initialize placeholder arrays for all cells over all timesteps
-            # Using NaN or another placeholder might be better than zero if distinguishing missing data is important
-            p_all = np.full((ncells_total, num_ts), np.nan) 
-            sw_all = np.full((ncells_total, num_ts), np.nan)
-            sg_all = np.full((ncells_total, num_ts), np.nan)
+            return self._to_grid(p_all, sw_all, sg_all, (i, j, k))
+            
+        except Exception as e:
+            self.logger.error(f"Data consolidation failed: {e}", exc_info=True) # Log traceback
+            raise ArraysError(f"Data consolidation failed: {e}")
 
-            # Fill arrays timestep by timestep
-            for t, state_structure in enumerate(result):
-                metadata = state_structure.get("metadata", {})
-                # Get the active cell indices for this specific timestep
-                idx_to_get = metadata.get("active_cell_indices", [])
-                if not idx_to_get:
-                    self.logger.warning(f"No active cell indices found for timestep {t}. Skipping.")
-                    continue
+    def _consolidate_stacked(
+        self,
+        stacked: Dict[str, Any]
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Consolidate results already stacked along a timestep axis.
+        
+        Args:
+            stacked: Stacked arrays and shared metadata, as returned by
+                SimResultsParser.get_stacked()
+            
+        Returns:
+            Tuple of (pressure, brine_saturation, gas_saturation) 
+            arrays, each with shape (i, j, k, num_timesteps).
+            
+        Raises:
+            ArraysError: If consolidation fails.
+        """
+        try:
+            metadata = stacked.get("metadata", {})
+            dimensions = metadata.get("dimensions")
+            if dimensions is None or len(dimensions) != 3:
+                raise ValueError("Missing or invalid dimensions in metadata")
+            i, j, k = dimensions
+            ncells_total = int(np.prod([i, j, k]))
+            
+            idx_to_get_np = np.asarray(metadata.get("active_cell_indices", []), dtype=np.intp)
+            if idx_to_get_np.size == 0 or np.any(idx_to_get_np >= ncells_total):
+                raise ValueError("Missing or out of range active cell indices in metadata")
+                
+            pressure = np.asarray(stacked["pressure"])
+            saturation = np.asarray(stacked["saturation"])
+            n_active = len(idx_to_get_np)
+            if pressure.shape[1:] != (n_active,) or saturation.shape[1:] != (n_active, 2):
+                raise ValueError(
+                    f"Stacked data shapes {pressure.shape} and {saturation.shape} "
+                    f"do not match {n_active} active cells"
+                )
                 
-                idx_to_get_np = np.array(idx_to_get)
+            filled = self._scatter(pressure, saturation, idx_to_get_np, ncells_total)
+            return self._to_grid(*filled, (i, j, k))
+            
+        except Exception as e:
+            self.logger.error(f"Data consolidation failed: {e}", exc_info=True)
+            raise ArraysError(f"Data consolidation failed: {e}")
 
-                # Validate indices against total cells
-                if np.any(idx_to_get_np >= ncells_total):
-                    self.logger.warning(
-                        f"Timestep {t}: Filtering out active cell indices >= {ncells_total}"
-                    )
-                    idx_to_get_np = idx_to_get_np[idx_to_get_np < ncells_total]
+    def _to_grid(
+        self,
+        p_all: np.ndarray,
+        sw_all: np.ndarray,
+        sg_all: np.ndarray,
+        dimensions: Tuple[int, int, int]
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Reshape (num_timesteps, ncells) arrays onto the grid.
+        
+        Args:
+            p_all: Pressure per timestep and cell
+            sw_all: Brine saturation per timestep and cell
+            sg_all: Gas saturation per timestep and cell
+            dimensions: Grid dimensions (i, j, k)
+            
+        Returns:
+            Tuple of (pressure, brine_saturation, gas_saturation) 
+            arrays, each with shape (i, j, k, num_timesteps).
+        """
+        i, j, k = dimensions
+        num_ts = p_all.shape[0]
+        self.timestamps = num_ts # Store the number of timesteps
 
-                if len(idx_to_get_np) == 0:
-                     self.logger.warning(f"Timestep {t}: No valid active cell indices after filtering. Skipping.")
-                     continue
+        # The (num_ts, ncells) C-ordered arrays are (ncells, num_ts) in
+        # Fortran order, so the final 4D reshape is a view
+        p_final = p_all.T.reshape((i, j, k, num_ts), order="F")
+        sw_final = sw_all.T.reshape((i, j, k, num_ts), order="F")
+        sg_final = sg_all.T.reshape((i, j, k, num_ts), order="F")
+        
+        self.logger.info(f"Successfully consolidated data into shape: {(i, j, k, num_ts)}")
+        return p_final, sw_final, sg_final
 
-                # Extract pressure and saturation data for the current timestep
-                pressure_data = np.array(state_structure.get("pressure", []))
-                # Saturation data from parser should already be (N_active, 2) list of lists
-                saturation_data = np.array(state_structure.get("saturation", [])) 
+    def _fill_rows(
+        self,
+        states: Iterable[Dict[str, Any]],
+        ncells_total: int,
+        num_states: Optional[int] = None
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Fill per-cell arrays one timestep at a time.
+        
+        Rows are written straight into preallocated output arrays. When the
+        number of states is not known up front, the arrays start small and
+        double in size as states arrive.
+        
+        Args:
+            states: Processed state dictionaries, one per timestep
+            ncells_total: Total number of grid cells
+            num_states: Number of states, if known
+            
+        Returns:
+            Tuple of (pressure, brine_saturation, gas_saturation) arrays,
+            each with shape (num_timesteps, ncells_total)
+            
+        Raises:
+            ValueError: If a state's data does not match its active cells
+        """
+        # Using NaN or another placeholder might be better than zero if distinguishing missing data is important
+        capacity = num_states or self.INITIAL_ROW_CAPACITY
+        p_all = np.full((capacity, ncells_total), np.nan)
+        sw_all = np.full((capacity, ncells_total), np.nan)
+        sg_all = np.full((capacity, ncells_total), np.nan)
+        num_ts = 0
+
+        # Fill arrays timestep by timestep
+        for t, state_structure in enumerate(states):
+            if t == capacity:
+                capacity *= 2
+                p_all, sw_all, sg_all = (
+                    self._grow_rows(rows, capacity) for rows in (p_all, sw_all, sg_all)
+                )
+            p_row, sw_row, sg_row = p_all[t], sw_all[t], sg_all[t]
+            num_ts = t + 1
+            
+            metadata = state_structure.get("metadata", {})
+            # Get the active cell indices for this specific timestep
+            idx_to_get_np = np.asarray(metadata.get("active_cell_indices", []), dtype=np.intp)
+            if idx_to_get_np.size == 0:
+                self.logger.warning(f"No active cell indices found for timestep {t}. Skipping.")
+                continue
+
+            # Validate indices against total cells
+            if np.any(idx_to_get_np >= ncells_total):
+                self.logger.warning(
+                    f"Timestep {t}: Filtering out active cell indices >= {ncells_total}"
+                )
+                idx_to_get_np = idx_to_get_np[idx_to_get_np < ncells_total]
 
-                # --- Data Validation ---
-                if pressure_data.size != len(idx_to_get_np):
-                     self.logger.error(f"Timestep {t}: Pressure data size ({pressure_data.size}) mismatch with filtered active indices ({len(idx_to_get_np)}).")
-                     raise ValueError(f"Pressure data size mismatch at timestep {t}")
-                if saturation_data.shape[0] != len(idx_to_get_np):
-                     self.logger.error(f"Timestep {t}: Saturation data rows ({saturation_data.shape[0]}) mismatch with filtered active indices ({len(idx_to_get_np)}).")
-                     raise ValueError(f"Saturation data size mismatch at timestep {t}")    
-                if saturation_data.ndim != 2 or saturation_data.shape[1] != 2:
-                    raise ValueError(f"Timestep {t}: Expected saturation data shape (N, 2), but got {saturation_data.shape}")
-                # --- End Validation ---
+            if len(idx_to_get_np) == 0:
+                 self.logger.warning(f"Timestep {t}: No valid active cell indices after filtering. Skipping.")
+                 continue
 
-                # Assign data for the current timestep t using the active indices
-                p_all[idx_to_get_np, t] = pressure_data
-                sw_all[idx_to_get_np, t] = saturation_data[:, 0]
-                sg_all[idx_to_get_np, t] = saturation_data[:, 1]
+            # Extract pressure and saturation data for the current timestep
+            pressure_data = np.asarray(state_structure.get("pressure", []))
+            # Saturation data is (N_active, 2), as a list of lists or an array
+            saturation_data = np.asarray(state_structure.get("saturation", []))
+
+            # --- Data Validation ---
+            if pressure_data.size != len(idx_to_get_np):
+                 self.logger.error(f"Timestep {t}: Pressure data size ({pressure_data.size}) mismatch with filtered active indices ({len(idx_to_get_np)}).")
+                 raise ValueError(f"Pressure data size mismatch at timestep {t}")
+            if saturation_data.shape[0] != len(idx_to_get_np):
+                 self.logger.error(f"Timestep {t}: Saturation data rows ({saturation_data.shape[0]}) mismatch with filtered active indices ({len(idx_to_get_np)}).")
+                 raise ValueError(f"Saturation data size mismatch at timestep {t}")    
+            if saturation_data.ndim != 2 or saturation_data.shape[1] != 2:
+                raise ValueError(f"Timestep {t}: Expected saturation data shape (N, 2), but got {saturation_data.shape}")
+            # --- End Validation ---
+
+            # Assign data for the current timestep t using the active indices
+            p_row[idx_to_get_np] = pressure_data
+            sw_row[idx_to_get_np] = saturation_data[:, 0]
+            sg_row[idx_to_get_np] = saturation_data[:, 1]
+
+        # Leading rows are contiguous, so trimming does not copy
+        return p_all[:num_ts], sw_all[:num_ts], sg_all[:num_ts]
+
+    @staticmethod
+    def _grow_rows(rows: np.ndarray, capacity: int) -> np.ndarray:
+        """Copy row-major data into a larger NaN-filled array.
+        
+        Args:
+            rows: Array of shape (num_rows, ncells_total)
+            capacity: Number of rows of the new array
+            
+        Returns:
+            Array of shape (capacity, ncells_total) starting with ``rows``
+        """
+        grown = np.full((capacity, rows.shape[1]), np.nan)
+        grown[:len(rows)] = rows
+        return grown
 
-            # Reshape the final arrays to 4D: (i, j, k, num_timesteps)
-            p_final = p_all.reshape((i, j, k, num_ts), order="F")
-            sw_final = sw_all.reshape((i, j, k, num_ts), order="F")
-            sg_final = sg_all.reshape((i, j, k, num_ts), order="F")
+    def _fill_stacked(
+        self,
+        result: List[Dict[str, Any]],
+        ncells_total: int
+    ) -> Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """Fill per-cell arrays for all timesteps at once.
+        
+        Only applies when every state has the same active cells and data
+        shapes, which is what SimResultsParser produces.
+        
+        Args:
+            result: Processed state dictionaries, one per timestep
+            ncells_total: Total number of grid cells
             
-            self.logger.info(f"Successfully consolidated data into shape: {(i, j, k, num_ts)}")
-            return p_final, sw_final, sg_final
+        Returns:
+            Tuple of (pressure, brine_saturation, gas_saturation) arrays,
+            each with shape (num_timesteps, ncells_total), or None if the
+            states cannot be stacked
+        """
+        indices = [
+            np.asarray(state.get("metadata", {}).get("active_cell_indices", []), dtype=np.intp)
+            for state in result
+        ]
+        idx_to_get_np = indices[0]
+        if idx_to_get_np.size == 0 or np.any(idx_to_get_np >= ncells_total):
+            return None
+        if not all(np.array_equal(idx, idx_to_get_np) for idx in indices[1:]):
+            return None
             
-        except Exception as e:
-            self.logger.error(f"Data consolidation failed: {e}", exc_info=True) # Log traceback
-            raise ArraysError(f"Data consolidation failed: {e}")
+        try:
+            pressure = np.stack([np.asarray(state["pressure"]) for state in result])
+            saturation = np.stack([np.asarray(state["saturation"]) for state in result])
+        except (KeyError, ValueError):
+            return None
+        n_active = len(idx_to_get_np)
+        if pressure.shape[1:] != (n_active,) or saturation.shape[1:] != (n_active, 2):
+            return None
+            
+        return self._scatter(pressure, saturation, idx_to_get_np, ncells_total)
+
+    def _scatter(
+        self,
+        pressure: np.ndarray,
+        saturation: np.ndarray,
+        idx_to_get_np: np.ndarray,
+        ncells_total: int
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Scatter stacked active-cell values onto all grid cells.
+        
+        Args:
+            pressure: Pressure of shape (num_timesteps, n_active)
+            saturation: Saturation of shape (num_timesteps, n_active, 2)
+            idx_to_get_np: Indices of the active cells
+            ncells_total: Total number of grid cells
+            
+        Returns:
+            Tuple of (pressure, brine_saturation, gas_saturation) arrays,
+            each with shape (num_timesteps, ncells_total); inactive cells
+            are NaN
+        """
+        num_ts = len(pressure)
+        p_all = np.full((num_ts, ncells_total), np.nan)
+        sw_all = np.full((num_ts, ncells_total), np.nan)
+        sg_all = np.full((num_ts, ncells_total), np.nan)
+        p_all[:, idx_to_get_np] = pressure
+        sw_all[:, idx_to_get_np] = saturation[:, :, 0]
+        sg_all[:, idx_to_get_np] = saturation[:, :, 1]
+        return p_all, sw_all, sg_all
 
     def save_npy(self, name: str, data: np.ndarray) -> Path:
         """Save array to .npy file.
@@ -162,7 +372,7 @@ class Arrays:
         try:
             file_path = self.output_data_path / f"{name}.npy"
             np.save(file_path, data)
-            self.logger.debug(f"Saved numpy array to {file_path}")
+            self.logger.debug("Saved numpy array to %s", file_path)
             return file_path
         except Exception as e:
             self.logger.error(f"Failed to save numpy array: {e}")
@@ -190,7 +400,7 @@ class Arrays:
                 dtype=data.dtype
             )
             z[:] = data
-            self.logger.debug(f"Saved zarr array to {file_path}")
+            self.logger.debug("Saved zarr array to %s", file_path)
             return file_path
         except Exception as e:
             self.logger.error(f"Failed to save zarr array: {e}")
@@ -214,15 +424,20 @@ class Arrays:
     def save_golden_data(
         self,
         sim_id: str,
-        result: Optional[List[Dict[str, Any]]] = None,
-        config: Optional[ArrayConfig] = None
+        result: Optional[Union[Iterable[Dict[str, Any]], Dict[str, Any]]] = None,
+        config: Optional[ArrayConfig] = None,
+        storage: Optional[CloudStorage] = None
     ) -> List[Tuple[str, Path]]:
         """Consolidate, save simulation data using parameter-based filenames, and optionally upload to S3.
         
         Args:
             sim_id: Simulation hash identifier
-            result: List of processed state dictionaries from SimResultsParser
+            result: Processed state dictionaries from SimResultsParser, as a
+                list or a lazily evaluated iterable, or the stacked arrays
+                from SimResultsParser.get_stacked()
             config: Array configuration
+            storage: Optional cloud storage to upload with, shared between
+                calls; created from config.s3_config if not given
             
         Returns:
             List of tuples containing (name, file_path) for saved files
@@ -274,22 +489,23 @@ class Arrays:
             for name, data in to_save.items():
                 file_path = save_fn(name, data)
                 saved_files.append((name, file_path))
-                self.logger.info(f"Saved {config.saving_method} data to {file_path}")
+                self.logger.info("Saved %s data to %s", config.saving_method, file_path)
             
             # Upload to S3 if enabled
             if config.upload_to_s3:
-                if not config.s3_config:
-                    raise ValueError("s3_config required for S3 upload")
+                if storage is None:
+                    if not config.s3_config:
+                        raise ValueError("s3_config required for S3 upload")
+                    storage = CloudStorage(**config.s3_config)
                     
-                storage = CloudStorage(**config.s3_config)
                 for name, file_path in saved_files:
                     # Example S3 path structure: consolidated/<param_string>/<filename> 
                     # (format_name needs adjustment if suffix is param string)
                     s3_key = f"consolidated/{file_path.stem}/{file_path.name}" # Simplified S3 key
                     # s3_key = f"consolidated/{self.format_name(name)}/{file_path.name}" # Old format_name logic might need update
-                    self.logger.info(f"Uploading {file_path} to s3://{storage.bucket_name}/{s3_key}")
+                    self.logger.info("Uploading %s to s3://%s/%s", file_path, storage.config.bucket_name, s3_key)
                     storage.upload_file(str(file_path), s3_key)
-                    self.logger.info(f"Successfully uploaded to {s3_key}")
+                    self.logger.info("Successfully uploaded to %s", s3_key)
             
             return saved_files
             
@@ -4,6 +4,7 @@ Handles S3 integration for data persistence.
 """
 
 import logging
+import os
 from pathlib import Path
 from typing import Optional, Dict, Any
 from dataclasses import dataclass
@@ -6,11 +6,13 @@ Handles storage and retrieval of simulation metadata and status.
 
 import sqlite3
 from pathlib import Path
-from typing import Optional, Tuple, Any, Dict
+from typing import Optional, Tuple, Any, Dict, Iterable, Set
 from contextlib import contextmanager
 import logging
 import ast
 
+import orjson
+
 # SQL Queries
 CREATE_TABLE_SIM = """
 CREATE TABLE IF NOT EXISTS simulations (
@@ -39,6 +41,16 @@ FROM simulations
 WHERE sim_hash = ?;
 """
 
+SELECT_EXISTING_HASHES = """
+SELECT sim_hash
+FROM simulations
+WHERE sim_hash IN ({placeholders});
+"""
+
+# Maximum number of hashes bound to a single IN query, below SQLite's
+# default host parameter limit
+MAX_QUERY_PARAMS = 500
+
 # Simulation status constants
 class SimulationStatus:
     CREATED = "CREATED"
@@ -47,6 +59,13 @@ class SimulationStatus:
     FAILED = "FAILED"
 
 
+# Valid status values, for O(1) membership checks
+VALID_STATUSES = frozenset(
+    value for key, value in vars(SimulationStatus).items()
+    if not key.startswith("_")
+)
+
+
 class DBManager:
     """Manages database operations for PUMLE simulations."""
     
@@ -125,7 +144,7 @@ class DBManager:
                     INSERT_SIM, 
                     (sim_hash, sim_id, fluid_params, SimulationStatus.CREATED)
                 )
-            self.logger.info(f"Inserted simulation record: {sim_hash}")
+            self.logger.info("Inserted simulation record: %s", sim_hash)
         except sqlite3.Error as e:
             self.logger.error(f"Failed to insert simulation {sim_hash}: {e}")
             raise
@@ -141,17 +160,88 @@ class DBManager:
             sqlite3.Error: If update fails
             ValueError: If status is invalid
         """
-        if new_status not in vars(SimulationStatus).values():
+        if new_status not in VALID_STATUSES:
             raise ValueError(f"Invalid status: {new_status}")
             
         try:
             with self._get_connection() as conn:
                 conn.execute(UPDATE_SIM_STATUS, (new_status, sim_hash))
-            self.logger.info(f"Updated status for {sim_hash} to {new_status}")
+            self.logger.info("Updated status for %s to %s", sim_hash, new_status)
         except sqlite3.Error as e:
             self.logger.error(f"Failed to update status for {sim_hash}: {e}")
             raise
             
+    def insert_simulations(self, rows: Iterable[Tuple[str, int, str]]) -> None:
+        """Insert several simulation records in a single transaction.
+        
+        Args:
+            rows: (sim_hash, sim_id, fluid_params) tuples
+            
+        Raises:
+            sqlite3.Error: If insertion fails
+        """
+        records = [
+            (sim_hash, sim_id, fluid_params, SimulationStatus.CREATED)
+            for sim_hash, sim_id, fluid_params in rows
+        ]
+        try:
+            with self._get_connection() as conn:
+                conn.executemany(INSERT_SIM, records)
+            self.logger.info("Inserted %d simulation records", len(records))
+        except sqlite3.Error as e:
+            self.logger.error("Failed to insert %d simulations: %s", len(records), e)
+            raise
+            
+    def update_sim_status_many(self, sim_hashes: Iterable[str], new_status: str) -> None:
+        """Update the status of several simulations in a single transaction.
+        
+        Args:
+            sim_hashes: Unique hashes identifying the simulations
+            new_status: New status to set
+            
+        Raises:
+            sqlite3.Error: If update fails
+            ValueError: If status is invalid
+        """
+        if new_status not in VALID_STATUSES:
+            raise ValueError(f"Invalid status: {new_status}")
+            
+        records = [(new_status, sim_hash) for sim_hash in sim_hashes]
+        try:
+            with self._get_connection() as conn:
+                conn.executemany(UPDATE_SIM_STATUS, records)
+            self.logger.info("Updated status of %d simulations to %s", len(records), new_status)
+        except sqlite3.Error as e:
+            self.logger.error("Failed to update status of %d simulations: %s", len(records), e)
+            raise
+            
+    def select_existing_hashes(self, sim_hashes: Iterable[str]) -> Set[str]:
+        """Find which of the given simulation hashes are already recorded.
+        
+        Args:
+            sim_hashes: Hashes to look up
+            
+        Returns:
+            Set[str]: The subset of hashes present in the database
+            
+        Raises:
+            sqlite3.Error: If query fails
+        """
+        hashes = list(sim_hashes)
+        existing = set()
+        try:
+            with self._get_connection() as conn:
+                for start in range(0, len(hashes), MAX_QUERY_PARAMS):
+                    chunk = hashes[start:start + MAX_QUERY_PARAMS]
+                    query = SELECT_EXISTING_HASHES.format(
+                        placeholders=", ".join("?" * len(chunk))
+                    )
+                    existing.update(row[0] for row in conn.execute(query, chunk))
+            return existing
+        except sqlite3.Error as e:
+            self.logger.error(f"Failed to look up {len(hashes)} simulation hashes: {e}")
+            raise
+            
     def get_sim_by_hash(self, sim_hash: str) -> Optional[Tuple[Any, ...]]:
         """Retrieve simulation record by hash.
         
@@ -169,9 +259,9 @@ class DBManager:
                 cur = conn.execute(GET_SIM_BY_HASH, (sim_hash,))
                 row = cur.fetchone()
                 if row:
-                    self.logger.debug(f"Retrieved simulation record: {sim_hash}")
+                    self.logger.debug("Retrieved simulation record: %s", sim_hash)
                 else:
-                    self.logger.debug(f"No record found for simulation: {sim_hash}")
+                    self.logger.debug("No record found for simulation: %s", sim_hash)
                 return row
         except sqlite3.Error as e:
             self.logger.error(f"Failed to retrieve simulation {sim_hash}: {e}")
@@ -188,10 +278,13 @@ class DBManager:
             if row and row[0]:
                 params_str = row[0]
                 try:
-                    # Use ast.literal_eval for safe parsing of the dict string
-                    params_dict = ast.literal_eval(params_str)
+                    # Records are stored as JSON; older ones hold a Python dict repr
+                    try:
+                        params_dict = orjson.loads(params_str)
+                    except orjson.JSONDecodeError:
+                        params_dict = ast.literal_eval(params_str)
                     if isinstance(params_dict, dict):
-                        self.logger.debug(f"Retrieved fluid parameters for hash {sim_hash}.")
+                        self.logger.debug("Retrieved fluid parameters for hash %s.", sim_hash)
                         return params_dict
                     else:
                         # This case should ideally not happen if stored correctly
@@ -199,7 +292,7 @@ class DBManager:
                         return None
                 except (ValueError, SyntaxError) as parse_error:
                     self.logger.error(f"Failed to parse fluid_params string for hash {sim_hash}: {parse_error}")
-                    self.logger.debug(f"Invalid string was: {params_str}")
+                    self.logger.debug("Invalid string was: %s", params_str)
                     return None
             else:
                 self.logger.warning(f"No fluid_params found in database for sim_hash: {sim_hash}")
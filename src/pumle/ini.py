@@ -6,8 +6,9 @@ Handles reading and validation of INI configuration files.
 import logging
 import configparser
 import os
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Tuple, Any, Optional, Union
+from typing import Callable, Dict, List, Tuple, Any, Optional, Union
 from dataclasses import dataclass
 
 from .paths import Paths
@@ -26,6 +27,49 @@ class IniError(Exception):
     pass
 
 
+# A section's parameters, each paired with the function casting its raw value
+SectionPlan = Tuple[str, Tuple[Tuple[str, Callable[[str], Any]], ...]]
+
+
+def _parse_bool(value: str) -> bool:
+    """Interpret an INI string as a boolean flag."""
+    return value.lower() in ("true", "1", "yes", "on")
+
+
+def _keep_str(value: str) -> str:
+    """Return an INI string unchanged."""
+    return value
+
+
+@lru_cache(maxsize=32)
+def _compile_schema(
+    schema_key: Tuple[Tuple[str, Tuple[Tuple[str, ...], bool]], ...],
+    cast_bool_params: bool
+) -> Tuple[SectionPlan, ...]:
+    """Resolve the cast of every schema parameter once per schema.
+    
+    Args:
+        schema_key: Sections schema as nested tuples, hashable for caching
+        cast_bool_params: Whether ``*_flag`` parameters are cast to bool
+        
+    Returns:
+        Tuple of (section, ((param, cast), ...)) in schema order
+    """
+    plan = []
+    for section, (params, cast_to_float) in schema_key:
+        casts = []
+        for param in params:
+            if cast_to_float:
+                cast = float
+            elif cast_bool_params and param.endswith("_flag"):
+                cast = _parse_bool
+            else:
+                cast = _keep_str
+            casts.append((param, cast))
+        plan.append((section, tuple(casts)))
+    return tuple(plan)
+
+
 class Ini:
     """Parser for INI configuration files.
     
@@ -82,29 +126,6 @@ class Ini:
         if not os.access(self.config_path, os.R_OK):
             raise IniError(f"Configuration file not readable: {self.config_path}")
 
-    def _cast_value(self, value: str, cast_to_float: bool, param: str) -> Any:
-        """Cast a value to the appropriate type.
-        
-        Args:
-            value: Value to cast
-            cast_to_float: Whether to cast to float
-            param: Parameter name for bool detection
-            
-        Returns:
-            Casted value
-            
-        Raises:
-            ValueError: If casting fails
-        """
-        try:
-            if cast_to_float:
-                return float(value)
-            elif self.config.cast_bool_params and param.endswith("_flag"):
-                return value.lower() in ("true", "1", "yes", "on")
-            return value
-        except ValueError as e:
-            raise ValueError(f"Failed to cast value '{value}': {e}")
-
     def _load_config(self) -> None:
         """Load and parse the INI configuration file.
         
@@ -115,18 +136,25 @@ class Ini:
             config = configparser.ConfigParser()
             config.read(self.config_path)
             
+            schema_key = tuple(
+                (section, (tuple(params), bool(cast_to_float)))
+                for section, (params, cast_to_float) in self.sections_schema.items()
+            )
+            
             # Process each section in the schema
-            for section, (params, cast_to_float) in self.sections_schema.items():
+            for section, casts in _compile_schema(schema_key, self.config.cast_bool_params):
                 section_params = {}
                 
                 # If section exists, process its parameters
                 if config.has_section(section):
-                    for param in params:
+                    # Interpolate the whole section once instead of per get()
+                    options = dict(config.items(section))
+                    for param, cast in casts:
                         try:
-                            value = config.get(section, param)
-                            section_params[param] = self._cast_value(
-                                value, cast_to_float, param
-                            )
+                            key = config.optionxform(param)
+                            if key not in options:
+                                raise configparser.NoOptionError(param, section)
+                            section_params[param] = cast(options[key])
                         except (configparser.NoOptionError, ValueError) as e:
                             self.logger.error(
                                 f"Error reading parameter '{param}' from section '{section}': {e}"
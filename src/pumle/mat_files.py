@@ -3,9 +3,10 @@ MATLAB file operations for PUMLE simulations.
 Handles creation and management of MATLAB data files for simulation input.
 """
 
+import io
 import os
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from scipy.io import savemat
 import logging
 from dataclasses import dataclass
@@ -18,6 +19,7 @@ class MatFileConfig:
     staging_folder: str
     sim_hash: str
     params: Dict[str, Any]
+    compress: bool = False
 
 
 class MatFiles:
@@ -32,18 +34,45 @@ class MatFiles:
         "SimNums"
     ]
     
-    def __init__(self, params: Dict[str, Any]) -> None:
+    # Written last into the staging folder, once every section file exists
+    MARKER_FILE = "mat_written.marker"
+    
+    # Prefixed to the marker content, so folders staged in another file
+    # format (such as the former JSON sections) are written again
+    STAGING_FORMAT = b"mat|"
+    
+    # Written by the simulation driver once the folder's simulation finished
+    COMPLETION_FLAG = "completed.flag"
+    
+    # Per-simulation result files, named <prefix>_<case_name>_<sim_hash>.json
+    RESULT_PREFIXES = ("states", "grdecl")
+    
+    def __init__(
+        self,
+        params: Dict[str, Any],
+        buffer: Optional[io.BytesIO] = None,
+        compress: bool = False
+    ) -> None:
         """Initialize the MATLAB file manager.
         
         Args:
             params: Dictionary containing simulation parameters
+            buffer: Optional in-memory buffer to serialize ``.mat`` files
+                into, shared between instances to reuse its allocation
+            compress: Whether ``.mat`` files are zlib-compressed
             
         Raises:
             ValueError: If required parameters are missing
         """
         self._setup_logger()
         self.config = self._create_config(params)
+        self.config.compress = compress
         self._validate_params()
+        self._buffer = buffer if buffer is not None else io.BytesIO()
+        self._safe_sections = {
+            section: self._get_safe_section_name(section)
+            for section in self.config.params
+        }
         
     def _setup_logger(self) -> None:
         """Configure logging for the MATLAB file manager."""
@@ -99,7 +128,7 @@ class MatFiles:
         """
         try:
             path.mkdir(parents=True, exist_ok=True)
-            self.logger.debug(f"Created directory: {path}")
+            self.logger.debug("Created directory: %s", path)
         except OSError as e:
             self.logger.error(f"Failed to create directory {path}: {e}")
             raise
@@ -124,7 +153,9 @@ class MatFiles:
         Returns:
             Path: Full path to MATLAB file
         """
-        safe_section = self._get_safe_section_name(section)
+        safe_section = self._safe_sections.get(section)
+        if safe_section is None:
+            safe_section = self._get_safe_section_name(section)
         return (
             Path(self.config.pumle_root) /
             "data_lake" /
@@ -133,27 +164,188 @@ class MatFiles:
             f"{safe_section}_{self.config.sim_hash}.mat"
         )
         
-    def write(self) -> None:
+    def _write_bytes(
+        self,
+        path: Path,
+        data: Any,
+        dir_fd: Optional[int] = None
+    ) -> None:
+        """Write a whole buffer to a file with a single open descriptor.
+        
+        Args:
+            path: Destination path
+            data: Bytes-like object to write
+            dir_fd: Optional descriptor of the destination directory; when
+                given, the file is opened relative to it by name
+            
+        Raises:
+            OSError: If the file cannot be written
+        """
+        view = memoryview(data)
+        flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC
+        if dir_fd is not None:
+            fd = os.open(path.name, flags, 0o644, dir_fd=dir_fd)
+        else:
+            fd = os.open(path, flags, 0o644)
+        try:
+            written = 0
+            while written < len(view):
+                written += os.write(fd, view[written:])
+        finally:
+            view.release()
+            os.close(fd)
+            
+    def _write_mat_file(
+        self,
+        mat_file: Path,
+        content: Dict[str, Any],
+        dir_fd: Optional[int] = None
+    ) -> None:
+        """Serialize a section in memory and flush it with a single write.
+        
+        ``savemat`` seeks back to patch headers while writing; doing that
+        against a ``BytesIO`` keeps the real file descriptor to one write.
+        The buffer is reused across sections. Compression is off unless
+        requested, as zlib dominates the cost of writing large grids.
+        
+        Args:
+            mat_file: Destination path of the MATLAB file
+            content: Section content to serialize
+            dir_fd: Optional descriptor of the destination directory
+            
+        Raises:
+            OSError: If the file cannot be written
+        """
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        savemat(self._buffer, content, do_compression=self.config.compress)
+        data = self._buffer.getbuffer()
+        try:
+            self._write_bytes(mat_file, data, dir_fd)
+        finally:
+            data.release()
+        
+    @classmethod
+    def staging_path(cls, pumle_root: str, staging_folder: str) -> Path:
+        """Get the staging directory of a simulation.
+        
+        Args:
+            pumle_root: PUMLE root directory
+            staging_folder: Name of the simulation's staging folder
+            
+        Returns:
+            Path: Staging directory
+        """
+        return Path(pumle_root) / "data_lake" / "staging" / staging_folder
+        
+    @classmethod
+    def is_written(
+        cls,
+        pumle_root: str,
+        staging_folder: str,
+        marker: bytes = b""
+    ) -> bool:
+        """Check whether a staging folder was completely written.
+        
+        Args:
+            pumle_root: PUMLE root directory
+            staging_folder: Name of the simulation's staging folder
+            marker: Content the marker file must hold
+            
+        Returns:
+            bool: True if the marker file exists with the given content,
+                written in the current staging format
+        """
+        marker_file = cls.staging_path(pumle_root, staging_folder) / cls.MARKER_FILE
+        try:
+            return marker_file.read_bytes() == cls.STAGING_FORMAT + marker
+        except OSError:
+            return False
+        
+    def write(self, marker: bytes = b"") -> None:
         """Write all parameter sections to MATLAB files.
         
+        Every section is written as a ``.mat`` file, which the simulation
+        script loads with ``load``. A marker file holding the staging format
+        and ``marker`` is written once all sections succeeded.
+        
+        Args:
+            marker: Content of the marker file, identifying the inputs the
+                files were generated from
+        
         Raises:
             FileNotFoundError: If file writing fails
         """
-        staging_path = (
-            Path(self.config.pumle_root) /
-            "data_lake" /
-            "staging" /
-            self.config.staging_folder
+        staging_path = self.staging_path(
+            self.config.pumle_root, self.config.staging_folder
         )
         self._create_directory(staging_path)
         
+        # Resolve the staging directory once and open every section file
+        # relative to it
+        dir_fd = None
+        if os.open in os.supports_dir_fd:
+            dir_fd = os.open(staging_path, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            self._remove_previous_run(dir_fd)
+            self._write_sections(dir_fd)
+            self._write_bytes(
+                staging_path / self.MARKER_FILE, self.STAGING_FORMAT + marker, dir_fd
+            )
+        finally:
+            if dir_fd is not None:
+                os.close(dir_fd)
+                
+    def _remove_previous_run(self, dir_fd: Optional[int] = None) -> None:
+        """Remove the marker, completion flag and results of an earlier run.
+        
+        Args:
+            dir_fd: Optional descriptor of the staging directory
+            
+        Raises:
+            OSError: If an existing file cannot be removed
+        """
+        staging_path = self.staging_path(
+            self.config.pumle_root, self.config.staging_folder
+        )
+        for name in (self.MARKER_FILE, self.COMPLETION_FLAG):
+            try:
+                if dir_fd is not None:
+                    os.unlink(name, dir_fd=dir_fd)
+                else:
+                    os.unlink(staging_path / name)
+            except FileNotFoundError:
+                pass
+                
+        results_dir = self.config.params["Paths"].get("PUMLE_RESULTS")
+        case_name = self.config.params["Pre-Processing"].get("case_name")
+        if not results_dir or not case_name:
+            return
+        results_path = Path(self.config.pumle_root) / results_dir
+        for prefix in self.RESULT_PREFIXES:
+            result_file = results_path / f"{prefix}_{case_name}_{self.config.sim_hash}.json"
+            try:
+                result_file.unlink()
+                self.logger.info("Removed result of a previous run: %s", result_file)
+            except FileNotFoundError:
+                pass
+                
+    def _write_sections(self, dir_fd: Optional[int] = None) -> None:
+        """Write every parameter section into the staging folder.
+        
+        Args:
+            dir_fd: Optional descriptor of the staging directory
+            
+        Raises:
+            FileNotFoundError: If file writing fails
+        """
         for section, content in self.config.params.items():
             mat_file = self._get_mat_file_path(section)
             try:
-                savemat(str(mat_file), content, appendmat=True)
-                self.logger.info(f"Created MATLAB file: {mat_file}")
+                self._write_mat_file(mat_file, content, dir_fd)
+                self.logger.info("Created parameter file: %s", mat_file)
             except Exception as e:
-                self.logger.error(f"Failed to create MATLAB file {mat_file}: {e}")
+                self.logger.error(f"Failed to create parameter file {mat_file}: {e}")
                 raise FileNotFoundError(
-                    f"Failed to export MATLAB file '{mat_file.name}': {e}"
+                    f"Failed to export parameter file '{mat_file.name}': {e}"
                 )
@@ -3,12 +3,15 @@ Metadata handling for PUMLE simulations.
 Manages simulation parameters, validation, and storage.
 """
 
+import ast
 import logging
 from pathlib import Path
 from typing import Dict, List, Optional, Union, Any, Tuple
 from dataclasses import dataclass
 from functools import reduce
+from operator import itemgetter
 
+import numpy as np
 import pandas as pd
 import pandera as pa
 from pandera import DataFrameSchema, Column
@@ -59,6 +62,37 @@ BASE_SCHEMA = DataFrameSchema(
 )
 
 
+# Full schema including the columns derived from grid dimensions and timestamps
+FULL_SCHEMA = BASE_SCHEMA.add_columns(
+    {
+        "dimension_x": Column(int, checks=pa.Check.gt(0), nullable=False),
+        "dimension_y": Column(int, checks=pa.Check.gt(0), nullable=False),
+        "dimension_z": Column(int, checks=pa.Check.gt(0), nullable=False),
+        "timestamps": Column(int, checks=pa.Check.gt(0), nullable=False),
+    }
+)
+
+
+# Target types of the columns derived from the parameter sections
+COLUMN_TYPES: Dict[str, type] = {
+    "sim_id": str,
+    "fluid__pres_ref": float,
+    "fluid__temp_ref": float,
+    "fluid__cp_rock": float,
+    "fluid__srw": float,
+    "fluid__src": float,
+    "fluid__pe": float,
+    "fluid__xnacl": float,
+    "fluid__rho_h2o": float,
+    "initial_conditions__sw_0": float,
+    "wells__co2_inj": float,
+    "schedule__injection_time": int,
+    "schedule__migration_time": int,
+    "schedule__injection_timesteps": int,
+    "schedule__migration_timesteps": int,
+}
+
+
 class Metadata:
     """Handles metadata operations for simulation data."""
     
@@ -79,7 +113,7 @@ class Metadata:
         self.logger = logging.getLogger("pumle.metadata")
         self.path = Path(path)
         self.config = config or MetadataConfig()
-        self.schema = BASE_SCHEMA.copy()
+        self.schema = FULL_SCHEMA
         
         # Initialize data attributes
         self.parameters: Optional[pd.DataFrame] = None
@@ -128,74 +162,43 @@ class Metadata:
         clear = lambda x: x.replace(" ", "_").replace("-", "_").lower()
         return reduce(lambda x, y: clear(x) + "__" + clear(y), column_name)
 
-    def _cast_columns(
-        self, 
-        df: pd.DataFrame, 
-        columns: List[str], 
-        dtype: type
-    ) -> None:
-        """Cast DataFrame columns to specified type.
+    def _typed_buffer(self, column: str, size: int) -> np.ndarray:
+        """Allocate the output buffer of a derived column.
         
         Args:
-            df: DataFrame to modify
-            columns: Columns to cast
-            dtype: Target data type
+            column: Formatted column name
+            size: Number of rows
             
-        Raises:
-            MetadataError: If casting fails
+        Returns:
+            Empty array with the column's target type
         """
-        try:
-            for column in columns:
-                df[column] = df[column].astype(dtype)
-        except Exception as e:
-            self.logger.error(f"Failed to cast columns: {e}")
-            raise MetadataError(f"Column casting failed: {e}")
+        dtype = COLUMN_TYPES.get(column, object)
+        return np.empty(size, dtype=object if dtype is str else dtype)
 
-    def _cast_base_cols(self) -> None:
-        """Cast base columns to appropriate types.
+    def _get_rows(self) -> List[Dict[str, Any]]:
+        """Get the input parameter sets as a list of row dictionaries.
         
-        Raises:
-            MetadataError: If casting fails
+        Returns:
+            List of parameter sets, one per simulation
         """
-        try:
-            # Cast string columns
-            self._cast_columns(self.parameters, ["sim_id"], str)
-            
-            # Cast integer columns
-            int_columns = [
-                "schedule__injection_time",
-                "schedule__migration_time",
-                "schedule__injection_timesteps",
-                "schedule__migration_timesteps",
-            ]
-            self._cast_columns(self.parameters, int_columns, int)
-            
-            # Cast float columns
-            float_columns = [
-                "fluid__pres_ref",
-                "fluid__temp_ref",
-                "fluid__cp_rock",
-                "fluid__srw",
-                "fluid__src",
-                "fluid__pe",
-                "fluid__xnacl",
-                "fluid__rho_h2o",
-                "initial_conditions__sw_0",
-                "wells__co2_inj",
-            ]
-            self._cast_columns(self.parameters, float_columns, float)
-        except Exception as e:
-            self.logger.error(f"Failed to cast base columns: {e}")
-            raise MetadataError(f"Base column casting failed: {e}")
+        if isinstance(self.parameters, pd.DataFrame):
+            return self.parameters.to_dict("records")
+        return list(self.parameters)
 
-    def _clean_parameters(self) -> None:
-        """Clean and format parameter data.
+    def _build_columns(self) -> Dict[str, Any]:
+        """Build every metadata column in a single pass over the parameters.
+        
+        Section values are flattened into preallocated typed buffers, and
+        dimension/timestamp columns are filled alongside them.
         
+        Returns:
+            Mapping of column name to column values
+            
         Raises:
-            MetadataError: If cleaning fails
+            MetadataError: If building the columns fails
         """
         try:
-            columns_to_parse = {
+            sections_to_parse = {
                 "Fluid",
                 "Initial Conditions",
                 "Boundary Conditions",
@@ -204,7 +207,7 @@ class Metadata:
                 "SimNums",
             }
             
-            columns_to_drop = [
+            sections_to_drop = {
                 "Paths",
                 "Pre-Processing",
                 "Grid",
@@ -215,32 +218,62 @@ class Metadata:
                 "Schedule",
                 "EXECUTION",
                 "SimNums",
-            ]
+            }
+            
+            rows = self._get_rows()
+            n_rows = len(rows)
             
+            # Per section: a getter extracting all its fields at once and the
+            # (column, buffer, cast_to_str) targets in the same order
+            section_targets = []
             for main_field, (child_fields, _) in self.base_schema.items():
-                if main_field not in columns_to_parse:
+                if main_field not in sections_to_parse or not child_fields:
                     continue
-                    
-                values = self.parameters[main_field].values
-                values_extracted = (
-                    values if isinstance(values[0], dict) 
-                    else list(map(eval, values))
-                )
-                
+                getter = itemgetter(*child_fields)
+                targets = []
                 for child_field in child_fields:
-                    values = [value[child_field] for value in values_extracted]
                     if child_field == self.config.parameters_id:
-                        self.parameters[child_field] = values
+                        column = child_field
                     else:
-                        self.parameters[
-                            self._format_column_name(main_field, child_field)
-                        ] = values
-                        
-            self.parameters.drop(columns=columns_to_drop, inplace=True)
-            self._cast_base_cols()
+                        column = self._format_column_name(main_field, child_field)
+                    targets.append(
+                        (column, self._typed_buffer(column, n_rows),
+                         COLUMN_TYPES.get(column) is str)
+                    )
+                section_targets.append((main_field, getter, targets))
+            
+            passthrough = {
+                key: [None] * n_rows
+                for key in (rows[0] if rows else {})
+                if key not in sections_to_drop
+            }
+            
+            for row_idx, row in enumerate(rows):
+                for main_field, getter, targets in section_targets:
+                    section = row[main_field]
+                    if not isinstance(section, dict):
+                        section = ast.literal_eval(section)
+                    values = getter(section)
+                    if len(targets) == 1:
+                        values = (values,)
+                    for (_, buffer, cast_to_str), value in zip(targets, values):
+                        buffer[row_idx] = str(value) if cast_to_str else value
+                for key, values in passthrough.items():
+                    values[row_idx] = row[key]
+            
+            columns: Dict[str, Any] = dict(passthrough)
+            for _, _, targets in section_targets:
+                for column, buffer, _ in targets:
+                    columns[column] = buffer
+            
+            for axis, size in zip(("x", "y", "z"), self.dimensions):
+                columns[f"dimension_{axis}"] = np.full(n_rows, size, dtype=int)
+            columns["timestamps"] = np.full(n_rows, self.timestamps, dtype=int)
+            
+            return columns
         except Exception as e:
-            self.logger.error(f"Failed to clean parameters: {e}")
-            raise MetadataError(f"Parameter cleaning failed: {e}")
+            self.logger.error(f"Failed to build metadata columns: {e}")
+            raise MetadataError(f"Metadata column building failed: {e}")
 
     def _validate_schema(self) -> None:
         """Validate DataFrame against schema.
@@ -254,51 +287,6 @@ class Metadata:
             self.logger.error(f"Schema validation failed: {e}")
             raise MetadataError(f"Schema validation failed: {e}")
 
-    def _add_dimensions(self) -> None:
-        """Add dimension columns to DataFrame.
-        
-        Raises:
-            MetadataError: If dimension addition fails
-        """
-        try:
-            self.parameters["dimension_x"] = self.dimensions[0]
-            self.parameters["dimension_y"] = self.dimensions[1]
-            self.parameters["dimension_z"] = self.dimensions[2]
-            
-            self._cast_columns(
-                self.parameters, 
-                ["dimension_x", "dimension_y", "dimension_z"], 
-                int
-            )
-            
-            dimensions_schema = {
-                "dimension_x": Column(int, checks=pa.Check.gt(0), nullable=False),
-                "dimension_y": Column(int, checks=pa.Check.gt(0), nullable=False),
-                "dimension_z": Column(int, checks=pa.Check.gt(0), nullable=False),
-            }
-            self.schema.add_columns(dimensions_schema)
-        except Exception as e:
-            self.logger.error(f"Failed to add dimensions: {e}")
-            raise MetadataError(f"Dimension addition failed: {e}")
-
-    def _add_timestamps(self) -> None:
-        """Add timestamp column to DataFrame.
-        
-        Raises:
-            MetadataError: If timestamp addition fails
-        """
-        try:
-            self.parameters["timestamps"] = self.timestamps
-            self._cast_columns(self.parameters, ["timestamps"], int)
-            
-            timestamps_schema = {
-                "timestamps": Column(int, checks=pa.Check.gt(0), nullable=False),
-            }
-            self.schema.add_columns(timestamps_schema)
-        except Exception as e:
-            self.logger.error(f"Failed to add timestamps: {e}")
-            raise MetadataError(f"Timestamp addition failed: {e}")
-
     def save_metadata(self) -> Path:
         """Save metadata to CSV file.
         
@@ -309,11 +297,7 @@ class Metadata:
             MetadataError: If save operation fails
         """
         try:
-            self.to_data_frame()
-            self._clean_parameters()
-            self._validate_schema()
-            self._add_dimensions()
-            self._add_timestamps()
+            self.parameters = pd.DataFrame(self._build_columns())
             self._validate_schema()
             
             output_path = self.path / self.config.output_file
@@ -3,13 +3,18 @@ Parameter variation generator for PUMLE simulations.
 Handles generation of parameter combinations for sensitivity analysis.
 """
 
+import json
 import logging
-from copy import deepcopy
-from typing import Dict, List, Any, Optional, Union
+import math
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterator, List, Any, Optional, Tuple, Union
 import numpy as np
 from dataclasses import dataclass
+from scipy.stats import qmc
 
 from .parameters import Parameters
+from .utils import write_json
 
 
 @dataclass
@@ -20,6 +25,8 @@ class VariationConfig:
     default_class: str = "Fluid"
     min_delta: float = 0.01
     max_delta: float = 1.0
+    max_combinations: int = 2 ** 16
+    sampling_seed: Optional[int] = 0
 
 
 class ParameterVariationError(Exception):
@@ -27,6 +34,42 @@ class ParameterVariationError(Exception):
     pass
 
 
+@lru_cache(maxsize=128)
+def _make_parameter(name: str, base_value: float, variation_delta: float) -> Parameters:
+    """Build a Parameters object, reusing it for identical inputs.
+    
+    Args:
+        name: Parameter name
+        base_value: Base value for the parameter
+        variation_delta: Allowed variation from base value (fraction)
+        
+    Returns:
+        Parameters object with computed limits
+    """
+    return Parameters(
+        name=name,
+        base_value=base_value,
+        description=f"Variation of {name}",
+        variation_delta=variation_delta,
+    )
+
+
+@lru_cache(maxsize=64)
+def _points_per_parameter(variation_delta: float, min_points: int, max_points: int) -> int:
+    """Number of points sampled per parameter for a given delta.
+    
+    Args:
+        variation_delta: Relative variation range
+        min_points: Lower bound on the number of points
+        max_points: Upper bound on the number of points
+        
+    Returns:
+        ceil(1 / delta), clamped to [min_points, max_points]
+    """
+    points = math.ceil(1 / variation_delta) if variation_delta > 0 else 1
+    return max(min(points, max_points), min_points)
+
+
 class ParametersVariation:
     """Generator for parameter variations in simulations.
     
@@ -34,13 +77,16 @@ class ParametersVariation:
     sensitivity analysis and parameter sweeps.
     """
     
+    logger = logging.getLogger("pumle.parameter_variation")
+    
     def __init__(
         self,
         base_parameters: Dict[str, Dict[str, Any]],
         selected_parameters: List[str],
         variation_delta: float = 0.2,
         class_of_parameters: str = "Fluid",
-        config: Optional[VariationConfig] = None
+        config: Optional[VariationConfig] = None,
+        cache_file: Optional[Union[str, Path]] = None
     ) -> None:
         """Initialize the parameter variation generator.
         
@@ -50,11 +96,49 @@ class ParametersVariation:
             variation_delta: Relative variation range (0.0 to 1.0)
             class_of_parameters: Parameter class to vary
             config: Optional configuration settings
+            cache_file: Optional path (without extension) where combinations
+                are cached as ``.npy`` with a ``.json`` sidecar
             
         Raises:
             ParameterVariationError: If initialization fails
         """
-        self.logger = logging.getLogger("pumle.parameter_variation")
+        self._initialize(
+            base_parameters,
+            selected_parameters,
+            variation_delta,
+            class_of_parameters,
+            config,
+            cache_file,
+        )
+        
+        try:
+            cached = self.load_variations_from_cache()
+            if cached is not None:
+                self.parameters_combinations = cached
+            else:
+                self._generate_combinations()
+                self.save_variations_to_cache()
+        except Exception as e:
+            self.logger.error(f"Failed to initialize parameter variation: {e}")
+            raise ParameterVariationError(f"Initialization failed: {e}")
+
+    def _initialize(
+        self,
+        base_parameters: Dict[str, Dict[str, Any]],
+        selected_parameters: List[str],
+        variation_delta: float = 0.2,
+        class_of_parameters: str = "Fluid",
+        config: Optional[VariationConfig] = None,
+        cache_file: Optional[Union[str, Path]] = None
+    ) -> None:
+        """Validate inputs and set up state, without generating combinations.
+        
+        Args:
+            Same as ``__init__``
+            
+        Raises:
+            ParameterVariationError: If validation fails
+        """
         self.config = config or VariationConfig()
         
         try:
@@ -75,22 +159,105 @@ class ParametersVariation:
             self.class_of_parameters = class_of_parameters
             
             # Calculate number of points for each parameter
-            self.points_in_each_parameter = max(
-                min(
-                    int(1 / variation_delta) if variation_delta > 0 else 1,
-                    self.config.max_points
-                ),
-                self.config.min_points
+            self.points_in_each_parameter = _points_per_parameter(
+                variation_delta,
+                self.config.min_points,
+                self.config.max_points
             )
             
+            # Only the varied class and SimNums are mutated per variation, so
+            # every other section can be shared between variations
+            self._check_shallow_copy_safe()
+            self._template = dict(self.base_parameters)
+            
             # Initialize combinations
+            self._parameters: Optional[List[Parameters]] = None
             self.parameters_combinations = None
-            self._generate_combinations()
+            self.cache_file = Path(cache_file) if cache_file else None
             
         except Exception as e:
             self.logger.error(f"Failed to initialize parameter variation: {e}")
             raise ParameterVariationError(f"Initialization failed: {e}")
 
+    @classmethod
+    def batch(
+        cls,
+        sweeps: List[Dict[str, Any]],
+        config: Optional[VariationConfig] = None
+    ) -> List["ParametersVariation"]:
+        """Generate variations for several sweeps at once.
+        
+        Sweeps sharing the same number of points per parameter have all their
+        ranges computed by a single ``np.linspace`` call.
+        
+        Args:
+            sweeps: Constructor keyword arguments for each sweep
+                (base_parameters, selected_parameters, variation_delta, ...)
+            config: Optional configuration shared by all sweeps
+            
+        Returns:
+            One ParametersVariation per sweep, in the same order
+            
+        Raises:
+            ParameterVariationError: If any sweep fails
+        """
+        variations = []
+        groups: Dict[int, List["ParametersVariation"]] = {}
+        for sweep in sweeps:
+            variation = cls.__new__(cls)
+            variation._initialize(config=config, **sweep)
+            variations.append(variation)
+            
+            cached = variation.load_variations_from_cache()
+            if cached is not None:
+                variation.parameters_combinations = cached
+            elif variation._exceeds_max_combinations():
+                variation._generate_combinations()
+                variation.save_variations_to_cache()
+            else:
+                groups.setdefault(variation.points_in_each_parameter, []).append(variation)
+                
+        try:
+            for points, members in groups.items():
+                bounds = [member._parameter_bounds() for member in members]
+                ranges = np.linspace(
+                    np.concatenate([mins for mins, _ in bounds]),
+                    np.concatenate([maxs for _, maxs in bounds]),
+                    points,
+                    axis=1
+                )
+                
+                offset = 0
+                for member, (mins, _) in zip(members, bounds):
+                    member._generate_combinations(ranges[offset:offset + len(mins)])
+                    member.save_variations_to_cache()
+                    offset += len(mins)
+        except Exception as e:
+            cls.logger.error(f"Failed to generate batched variations: {e}")
+            raise ParameterVariationError(f"Batch generation failed: {e}")
+            
+        return variations
+
+    def _check_shallow_copy_safe(self) -> None:
+        """Validate that mutated sections only hold scalar values.
+        
+        Raises:
+            ValueError: If a mutated section is missing or holds containers
+        """
+        for section in (self.class_of_parameters, "SimNums"):
+            content = self.base_parameters.get(section)
+            if not isinstance(content, dict):
+                raise ValueError(f"Section {section} not found in base parameters")
+            nested = [
+                key for key, value in content.items()
+                if isinstance(value, (dict, list, np.ndarray))
+            ]
+            if nested:
+                raise ValueError(
+                    f"Section {section} must hold scalar values, "
+                    f"got containers for: {', '.join(nested)}"
+                )
+
     def get_parameters(self) -> List[Parameters]:
         """Get parameter objects for selected parameters.
         
@@ -100,62 +267,127 @@ class ParametersVariation:
         Raises:
             ParameterVariationError: If parameter creation fails
         """
+        if self._parameters is not None:
+            return list(self._parameters)
+            
         try:
             parameters = []
             for parameter in self.selected_parameters:
                 try:
                     base_value = self.base_parameters[self.class_of_parameters][parameter]
-                    parameters.append(
-                        Parameters(
-                            name=parameter,
-                            base_value=base_value,
-                            description=f"Variation of {parameter}",
-                            variation_delta=self.variation_delta,
-                        )
-                    )
                 except KeyError as e:
                     raise ValueError(f"Parameter {parameter} not found in {self.class_of_parameters}")
+                parameters.append(
+                    _make_parameter(parameter, base_value, self.variation_delta)
+                )
                     
-            return parameters
+            self._parameters = parameters
+            return list(parameters)
             
         except Exception as e:
             self.logger.error(f"Failed to get parameters: {e}")
             raise ParameterVariationError(f"Parameter creation failed: {e}")
 
-    def _format_combinations(self, combinations: List[List[float]]) -> np.ndarray:
+    def _format_combinations(self, combinations: List[np.ndarray]) -> np.ndarray:
         """Format parameter combinations into a matrix.
         
+        The cartesian product is written column by column into a single
+        preallocated array; the first parameter varies slowest.
+        
         Args:
-            combinations: List of parameter value lists
+            combinations: List of parameter value ranges
             
         Returns:
             Array of parameter combinations
         """
-        return np.array(np.meshgrid(*combinations)).T.reshape(
-            -1, len(self.selected_parameters)
+        sizes = [len(values) for values in combinations]
+        n_columns = len(sizes)
+        n_rows = int(np.prod(sizes)) if sizes else 0
+        output = np.empty((n_rows, n_columns), dtype=np.float64)
+        
+        outer, inner = 1, n_rows
+        for column, (values, size) in enumerate(zip(combinations, sizes)):
+            inner //= size
+            # View rows as (outer, size, inner) blocks and broadcast the range
+            blocks = output.reshape(outer, size, inner, n_columns)
+            blocks[:, :, :, column] = np.asarray(values)[None, :, None]
+            outer *= size
+        return output
+
+    def _parameter_bounds(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Get the lower and upper bounds of the selected parameters.
+        
+        Returns:
+            Tuple of (mins, maxs) arrays, one entry per selected parameter
+        """
+        parameters = self.get_parameters()
+        n_parameters = len(parameters)
+        mins = np.fromiter(
+            (parameter.min_value for parameter in parameters),
+            dtype=np.float64,
+            count=n_parameters
         )
+        maxs = np.fromiter(
+            (parameter.max_value for parameter in parameters),
+            dtype=np.float64,
+            count=n_parameters
+        )
+        return mins, maxs
+
+    def _exceeds_max_combinations(self) -> bool:
+        """Check whether the full grid is larger than the configured limit.
+        
+        Returns:
+            True if points_per_parameter ** k exceeds max_combinations
+        """
+        total = self.points_in_each_parameter ** len(self.selected_parameters)
+        return total > self.config.max_combinations
 
-    def _generate_combinations(self) -> None:
+    def _sample_combinations(self) -> np.ndarray:
+        """Sample parameter combinations from a scrambled Sobol sequence.
+        
+        Used instead of the full grid when it would exceed max_combinations.
+        The number of samples is the largest power of two within the limit.
+        
+        Returns:
+            Array of shape (samples, k) with values within the parameter bounds
+        """
+        mins, maxs = self._parameter_bounds()
+        sampler = qmc.Sobol(
+            d=len(mins), scramble=True, seed=self.config.sampling_seed
+        )
+        samples = sampler.random_base2(m=int(math.log2(self.config.max_combinations)))
+        return mins + samples * (maxs - mins)
+
+    def _generate_combinations(self, ranges: Optional[np.ndarray] = None) -> None:
         """Generate all parameter value combinations.
         
+        When the full grid would exceed ``config.max_combinations``, the
+        combinations are sampled from a Sobol sequence instead.
+        
+        Args:
+            ranges: Optional precomputed (k, points) matrix of parameter ranges
+        
         Raises:
             ParameterVariationError: If combination generation fails
         """
         try:
-            parameters = self.get_parameters()
-            parameters_combinations = []
-            
-            for parameter in parameters:
-                range_of_values = np.linspace(
-                    parameter.min_value,
-                    parameter.max_value,
-                    self.points_in_each_parameter
+            if self._exceeds_max_combinations():
+                self.parameters_combinations = self._sample_combinations()
+                self.logger.warning(
+                    f"Full grid of {self.points_in_each_parameter} points over "
+                    f"{len(self.selected_parameters)} parameters exceeds "
+                    f"{self.config.max_combinations} combinations; sampled "
+                    f"{len(self.parameters_combinations)} Sobol points instead"
                 )
-                parameters_combinations.append(list(range_of_values))
+                return
                 
-            self.parameters_combinations = self._format_combinations(
-                parameters_combinations
-            )
+            if ranges is None:
+                # One (k, points) matrix holding the range of every parameter
+                mins, maxs = self._parameter_bounds()
+                ranges = np.linspace(mins, maxs, self.points_in_each_parameter, axis=1)
+                
+            self.parameters_combinations = self._format_combinations(list(ranges))
             
             self.logger.info(
                 f"Generated {len(self.parameters_combinations)} parameter combinations"
@@ -165,6 +397,135 @@ class ParametersVariation:
             self.logger.error(f"Failed to generate parameter combinations: {e}")
             raise ParameterVariationError(f"Combination generation failed: {e}")
 
+    def _cache_paths(self) -> Tuple[Path, Path]:
+        """Get the array and metadata paths of the combinations cache.
+        
+        Returns:
+            Tuple of (array path, metadata path)
+        """
+        return (
+            self.cache_file.with_suffix(".npy"),
+            self.cache_file.with_suffix(".json"),
+        )
+
+    def _cache_metadata(self) -> Dict[str, Any]:
+        """Describe the inputs the cached combinations were generated from.
+        
+        Returns:
+            Dictionary identifying the variation setup
+        """
+        base_class = self.base_parameters[self.class_of_parameters]
+        return {
+            "class": self.class_of_parameters,
+            "parameters": list(self.selected_parameters),
+            "base_values": [
+                float(base_class[parameter])
+                for parameter in self.selected_parameters
+            ],
+            "delta": self.variation_delta,
+            "points_per_parameter": self.points_in_each_parameter,
+            "max_combinations": self.config.max_combinations,
+            "sampling_seed": self.config.sampling_seed,
+        }
+
+    def save_variations_to_cache(self) -> None:
+        """Persist parameter combinations to the cache file, if configured.
+        
+        Failures are logged and otherwise ignored, since the cache is only an
+        optimization.
+        """
+        if self.cache_file is None or self.parameters_combinations is None:
+            return
+            
+        array_path, metadata_path = self._cache_paths()
+        try:
+            array_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(array_path, "wb") as file:
+                np.save(file, self.parameters_combinations)
+            write_json(metadata_path, self._cache_metadata())
+            self.logger.debug(f"Saved parameter combinations to {array_path}")
+        except Exception as e:
+            self.logger.warning(f"Failed to cache parameter combinations: {e}")
+
+    def load_variations_from_cache(self) -> Optional[np.ndarray]:
+        """Load cached parameter combinations matching this setup.
+        
+        The array is memory-mapped, so loading does not depend on its size.
+        
+        Returns:
+            Cached combinations, or None if absent, stale or unreadable
+        """
+        if self.cache_file is None:
+            return None
+            
+        array_path, metadata_path = self._cache_paths()
+        try:
+            with open(metadata_path, "rb") as file:
+                metadata = json.load(file)
+            if metadata != self._cache_metadata():
+                self.logger.debug(f"Ignoring stale parameter cache {array_path}")
+                return None
+            combinations = np.load(array_path, mmap_mode="r")
+            self.logger.info(
+                f"Loaded {len(combinations)} parameter combinations from cache"
+            )
+            return combinations
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            self.logger.warning(f"Failed to load parameter cache: {e}")
+            return None
+
+    def _build_variation(self, sim_id: int, combination: Any) -> Dict[str, Any]:
+        """Build the parameter set of one combination.
+        
+        Only the varied class and SimNums are copied; every other section is
+        shared with the base parameters.
+        
+        Args:
+            sim_id: Simulation ID (1-based)
+            combination: Values of the selected parameters, as Python floats
+            
+        Returns:
+            Parameter set with varied values
+        """
+        template = self._template
+        class_values = template[self.class_of_parameters].copy()
+        class_values.update(zip(self.selected_parameters, combination))
+        
+        sim_nums = template["SimNums"].copy()
+        sim_nums["sim_id"] = sim_id
+        
+        variation = template.copy()
+        variation[self.class_of_parameters] = class_values
+        variation["SimNums"] = sim_nums
+        return variation
+
+    def iter_variations(self) -> Iterator[Dict[str, Any]]:
+        """Lazily yield parameter variations for all combinations.
+        
+        Prefer this over generate_variations for large sweeps, since only one
+        parameter set is alive at a time.
+        
+        Yields:
+            Parameter sets with varied values
+            
+        Raises:
+            ParameterVariationError: If variation generation fails
+        """
+        if self.parameters_combinations is None:
+            raise ParameterVariationError(
+                "No parameter combinations available. Call _generate_combinations first."
+            )
+            
+        try:
+            # tolist() converts a whole row to Python floats in one call
+            for sim_id, combination in enumerate(self.parameters_combinations, start=1):
+                yield self._build_variation(sim_id, combination.tolist())
+        except Exception as e:
+            self.logger.error(f"Failed to generate parameter variations: {e}")
+            raise ParameterVariationError(f"Variation generation failed: {e}")
+
     def generate_variations(self) -> List[Dict[str, Any]]:
         """Generate parameter variations for all combinations.
         
@@ -180,24 +541,19 @@ class ParametersVariation:
             )
             
         try:
-            variations = []
-            for sim_id, combination in enumerate(self.parameters_combinations):
-                variation = deepcopy(self.base_parameters)
-                
-                # Update parameter values
-                for i, parameter in enumerate(self.selected_parameters):
-                    variation[self.class_of_parameters][parameter] = float(combination[i])
-                
-                # Set simulation ID
-                variation["SimNums"]["sim_id"] = sim_id + 1
-                variations.append(variation)
-                
-            self.logger.info(f"Generated {len(variations)} parameter variations")
-            return variations
-            
+            # One tolist() for the whole matrix, one allocation for the list
+            variations = [
+                self._build_variation(sim_id, combination)
+                for sim_id, combination in enumerate(
+                    self.parameters_combinations.tolist(), start=1
+                )
+            ]
         except Exception as e:
             self.logger.error(f"Failed to generate parameter variations: {e}")
             raise ParameterVariationError(f"Variation generation failed: {e}")
+            
+        self.logger.info(f"Generated {len(variations)} parameter variations")
+        return variations
 
     def get_variation_summary(self) -> Dict[str, Any]:
         """Get summary of parameter variations.
@@ -4,7 +4,7 @@ Handles file paths and directory structure for simulation data.
 """
 
 import logging
-from pathlib import Path
+from pathlib import Path, PurePosixPath
 from typing import Optional, Union
 from dataclasses import dataclass
 
@@ -68,17 +68,16 @@ class Paths:
             PathsError: If grid path is invalid
         """
         try:
-            # Convert to Path and resolve relative to base path
-            grid_path = Path(grid_path)
-            if not grid_path.is_absolute():
-                grid_path = self.path / grid_path
+            # Relative paths are joined to the base path; joining an
+            # absolute path yields it unchanged
+            grid_path = self.path / PurePosixPath(grid_path)
             
             # Validate grid file exists
-            if not grid_path.exists():
+            resolved = grid_path.resolve()
+            if not resolved.exists():
                 self.logger.error(f"Grid file not found: {grid_path}")
                 raise PathsError(f"Grid file not found: {grid_path}")
-                
-            return grid_path.resolve()
+            return resolved
         except Exception as e:
             self.logger.error(f"Failed to set grid path: {e}")
             raise PathsError(f"Grid path setting failed: {e}")
@@ -3,14 +3,22 @@ PUMLE - Python-based Unified Machine Learning Environment
 Core class for managing CO2 injection simulations.
 """
 
+import copy
+import io
+import itertools
 import logging
 import os
 import json
 import subprocess
+import threading
 import time
+from types import MappingProxyType
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional, Any, Union
+from typing import Callable, Dict, Iterable, Iterator, List, Mapping, NamedTuple, Optional, Any, Sequence, Tuple, Union
 import numpy as np
+import orjson
 import shutil
 
 from src.pumle.ini import Ini
@@ -18,9 +26,178 @@ from src.pumle.mat_files import MatFiles
 from src.pumle.parameters_variation import ParametersVariation
 from src.pumle.sim_results_parser import SimResultsParser
 from src.pumle.arrays import Arrays, ArrayConfig
-from src.pumle.tabular import Tabular
+from src.pumle.cloud_storage import CloudStorage
+from src.pumle.tabular import Tabular, TabularConfig
 from src.pumle.utils import generate_param_hash
-from src.pumle.db import DBManager
+from src.pumle.db import DBManager, SimulationStatus
+
+
+# Every Pumle instance shares this logger; its handler is added once, at import
+_logger = logging.getLogger("pumle")
+_logger.setLevel(logging.DEBUG)
+if not _logger.handlers:
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+    _logger.addHandler(_handler)
+
+
+# Simulation driver, relative to the working directory. Its g++ flags live
+# in a plain text file that simulation_script.sh reads as well.
+SIMULATION_DRIVER_SOURCE = os.path.join("simulation", "simulation.cpp")
+SIMULATION_DRIVER_BINARY = os.path.join("simulation", "simulationCompiled.out")
+SIMULATION_DRIVER_FLAGS_FILE = os.path.join("simulation", "compile_flags.txt")
+
+
+def build_simulation_driver(
+    source: str = SIMULATION_DRIVER_SOURCE,
+    binary: str = SIMULATION_DRIVER_BINARY,
+    flags_file: str = SIMULATION_DRIVER_FLAGS_FILE
+) -> str:
+    """Compile the simulation driver if it is missing or out of date.
+    
+    An up-to-date binary is reused instead of recompiled; editing the
+    source or the flags file triggers a rebuild.
+    
+    Args:
+        source: C++ source of the driver
+        binary: Path of the compiled driver
+        flags_file: File holding the whitespace-separated g++ flags
+        
+    Returns:
+        Path of the compiled driver
+        
+    Raises:
+        subprocess.CalledProcessError: If compilation fails
+    """
+    try:
+        built = os.stat(binary).st_mtime_ns
+        up_to_date = built >= max(
+            os.stat(source).st_mtime_ns, os.stat(flags_file).st_mtime_ns
+        )
+    except FileNotFoundError:
+        up_to_date = False
+        
+    if not up_to_date:
+        _logger.info(f"Compiling simulation driver {source}")
+        with open(flags_file, "r", encoding="utf-8") as file:
+            flags = file.read().split()
+        subprocess.run(["g++", source, "-o", binary, *flags], check=True)
+    return binary
+
+
+class SimInfo(NamedTuple):
+    """Identity of one pre-processed configuration."""
+    sim_hash: str
+    sim_id: Any
+    staging_folder: str
+    fluid: Dict[str, Any]
+
+
+SchemaKey = Tuple[Tuple[str, Tuple[Tuple[str, ...], bool]], ...]
+
+
+def _freeze_schema(params_schema: Mapping[str, Tuple[Sequence[str], bool]]) -> SchemaKey:
+    """Convert a parameter schema into a hashable cache key.
+    
+    Args:
+        params_schema: Section name -> (parameter names, cast_to_float)
+        
+    Returns:
+        Nested tuples with the same content
+    """
+    return tuple(
+        (section, (tuple(parameters), cast_to_float))
+        for section, (parameters, cast_to_float) in params_schema.items()
+    )
+
+
+@lru_cache(maxsize=8)
+def _load_base(
+    setup_ini: str,
+    mtime_ns: int,
+    root_path: str,
+    schema_key: SchemaKey
+) -> Dict[str, Dict[str, Any]]:
+    """Parse a setup INI file, caching the result per file version.
+    
+    The modification time is part of the key, so editing the file yields a
+    fresh parse. The returned dict is shared and must not be mutated.
+    
+    Args:
+        setup_ini: Absolute path of the INI file
+        mtime_ns: Modification time of the INI file
+        root_path: Root path for resolving relative paths
+        schema_key: Parameter schema, as returned by _freeze_schema
+        
+    Returns:
+        Parsed base parameters
+    """
+    return Ini(root_path, setup_ini, dict(schema_key)).get_params()
+
+
+@lru_cache(maxsize=4096)
+def _hash_fluid(fluid_items: Tuple[Tuple[str, Any], ...]) -> str:
+    """Hash Fluid parameters, reusing digests of identical parameter sets.
+    
+    Args:
+        fluid_items: Sorted (name, value) pairs of the Fluid section
+        
+    Returns:
+        Simulation hash of the Fluid parameters
+    """
+    return generate_param_hash(dict(fluid_items))
+
+
+def _serialize_fluid(fluid_params: Dict[str, Any]) -> str:
+    """Serialize Fluid parameters as canonical JSON for the database.
+    
+    Args:
+        fluid_params: Fluid section of a configuration
+        
+    Returns:
+        JSON string with sorted keys
+    """
+    return orjson.dumps(
+        fluid_params, option=orjson.OPT_SORT_KEYS | orjson.OPT_SERIALIZE_NUMPY
+    ).decode()
+
+
+def _init_mat_files_worker() -> None:
+    """Silence per-file MatFiles logging in a worker process.
+    
+    Workers report each configuration's outcome back to the parent, which
+    does the logging, so only warnings and errors are emitted here.
+    """
+    logging.getLogger("pumle.mat_files").addFilter(
+        lambda record: record.levelno >= logging.WARNING
+    )
+
+
+# Per-thread .mat serialization buffers, reused by every configuration a
+# worker writes; thread-local so in-process callers never share one
+_mat_buffers = threading.local()
+
+
+def _write_mat_files(params: Dict, marker: bytes = b"") -> Optional[str]:
+    """Write the staging files of one configuration.
+    
+    Runs in a worker process, so errors are returned instead of raised.
+    
+    Args:
+        params: Simulation parameters, including SimNums
+        marker: Content of the staging folder's marker file
+        
+    Returns:
+        None on success, or the error message on failure
+    """
+    buffer = getattr(_mat_buffers, "buffer", None)
+    if buffer is None:
+        buffer = _mat_buffers.buffer = io.BytesIO()
+    try:
+        MatFiles(params, buffer=buffer).write(marker)
+        return None
+    except Exception as e:
+        return str(e)
 
 
 class Pumle:
@@ -30,14 +207,29 @@ class Pumle:
     DEFAULT_PARAMETER_VARIATION = 0.2
     DEFAULT_NUM_THREADS = 4
     DEFAULT_SAVING_METHOD = "numpy"
+    DEFAULT_TABULAR_FORMAT = "csv"
+    
+    # Configurations sent to each worker at once when writing .mat files
+    MAT_FILES_CHUNKSIZE = 8
+    
+    # Seconds between checks for completed simulations while they run
+    COMPLETION_POLL_INTERVAL = 1.0
+    
+    # Seconds a terminated simulation driver gets to exit before it is killed
+    PROCESS_TERMINATE_TIMEOUT = 5.0
+    
+    # Simulation driver, relative to the working directory
+    SIMULATION_DRIVER_SOURCE = SIMULATION_DRIVER_SOURCE
+    SIMULATION_DRIVER_BINARY = SIMULATION_DRIVER_BINARY
+    SIMULATION_DRIVER_FLAGS_FILE = SIMULATION_DRIVER_FLAGS_FILE
     
-    # Default parameter schema
-    DEFAULT_PARAMS_SCHEMA = {
-        "Paths": (["PUMLE_ROOT", "PUMLE_RESULTS"], False),
-        "Pre-Processing": (["case_name", "file_basename", "model_name"], False),
-        "Grid": (["file_path", "repair_flag"], False),
+    # Default parameter schema, shared read-only by all instances
+    DEFAULT_PARAMS_SCHEMA = MappingProxyType({
+        "Paths": (("PUMLE_ROOT", "PUMLE_RESULTS"), False),
+        "Pre-Processing": (("case_name", "file_basename", "model_name"), False),
+        "Grid": (("file_path", "repair_flag"), False),
         "Fluid": (
-            [
+            (
                 "pres_ref",
                 "temp_ref",
                 "cp_rock",
@@ -46,25 +238,25 @@ class Pumle:
                 "pe",
                 "XNaCl",
                 "rho_h2o",
-            ],
+            ),
             True,
         ),
-        "Initial Conditions": (["sw_0"], True),
-        "Boundary Conditions": (["type"], False),
-        "Wells": (["CO2_inj"], True),
+        "Initial Conditions": (("sw_0",), True),
+        "Boundary Conditions": (("type",), False),
+        "Wells": (("CO2_inj",), True),
         "Schedule": (
-            [
+            (
                 "injection_time",
                 "migration_time",
                 "injection_timesteps",
                 "migration_timesteps",
                 "injection_rampup_dt_initial",
-            ],
+            ),
             True,
         ),
-        "EXECUTION": (["octave", "mrst_root"], False),
-        "SimNums": (["sim_id"], True),
-    }
+        "EXECUTION": (("octave", "mrst_root"), False),
+        "SimNums": (("sim_id",), True),
+    })
     
     # Default data lake paths
     DEFAULT_DATA_LAKE_PATHS = {
@@ -83,6 +275,8 @@ class Pumle:
         """
         self.config = config
         self.configs: Optional[List[Dict]] = None
+        self._storage: Optional[CloudStorage] = None
+        self._storage_lock = threading.Lock()
         self._setup_logger()
         self.db = DBManager()
         self._setup_paths()
@@ -91,11 +285,7 @@ class Pumle:
 
     def _setup_logger(self) -> None:
         """Configure logging for the PUMLE instance."""
-        self.logger = logging.getLogger("pumle")
-        self.logger.setLevel(logging.DEBUG)
-        handler = logging.StreamHandler()
-        handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
-        self.logger.addHandler(handler)
+        self.logger = _logger
 
     def _setup_paths(self) -> None:
         """Set up all required paths and configurations."""
@@ -108,10 +298,6 @@ class Pumle:
             "params_schema", 
             self.DEFAULT_PARAMS_SCHEMA
         )
-        self.simulation_script_path = os.path.join(
-            self.root_path, 
-            "simulation_script.sh"
-        )
         self.data_lake = self.config.get(
             "data_lake_paths", 
             self.DEFAULT_DATA_LAKE_PATHS
@@ -122,10 +308,9 @@ class Pumle:
         if not os.path.exists(self.setup_ini):
             raise FileNotFoundError(f"Setup file {self.setup_ini} not found")
 
-        if not os.path.exists(self.simulation_script_path):
-            raise FileNotFoundError(
-                f"Simulation script {self.simulation_script_path} not found"
-            )
+        for driver_file in (self.SIMULATION_DRIVER_SOURCE, self.SIMULATION_DRIVER_FLAGS_FILE):
+            if not os.path.exists(driver_file):
+                raise FileNotFoundError(f"Simulation driver file {driver_file} not found")
 
     def _validate_external_dependencies(self, params: Dict) -> None:
         """Validate external dependencies in parameters.
@@ -136,11 +321,27 @@ class Pumle:
         Raises:
             ValueError: If required external dependencies are missing
         """
-        if not params.get("EXECUTION", {}).get("octave"):
+        exec_cfg = params.get("EXECUTION") or {}
+        if not exec_cfg.get("octave"):
             raise ValueError("Octave path not found in setup.ini")
-        if not params.get("EXECUTION", {}).get("mrst_root"):
+        if not exec_cfg.get("mrst_root"):
             raise ValueError("MRST root path not found in setup.ini")
 
+    def _load_base_parameters(self) -> Dict[str, Dict[str, Any]]:
+        """Parse the setup INI, reusing the last parse while it is unchanged.
+        
+        Returns:
+            A private copy of the base parameters
+        """
+        ini_path = os.path.abspath(self.setup_ini)
+        base_parameter = _load_base(
+            ini_path,
+            os.stat(ini_path).st_mtime_ns,
+            str(self.root_path),
+            _freeze_schema(self.params_schema),
+        )
+        return copy.deepcopy(base_parameter)
+
     def pre_process(self) -> List[Dict]:
         """Prepare simulation parameters and generate necessary files.
         If variation_delta is 0, only the base parameters are used.
@@ -149,12 +350,7 @@ class Pumle:
             List of dictionaries containing simulation configurations (usually one if delta is 0)
         """
         self.logger.info("Starting pre-processing...")
-        ini_reader = Ini(
-            self.root_path, 
-            self.setup_ini, 
-            self.params_schema
-        )
-        base_parameter = ini_reader.get_params()
+        base_parameter = self._load_base_parameters()
         self.logger.debug("Base parameters loaded from INI.")
 
         self._validate_external_dependencies(base_parameter)
@@ -163,72 +359,84 @@ class Pumle:
         variation_delta = self.config.get("variation_delta", self.DEFAULT_PARAMETER_VARIATION)
         selected_parameters = self.config.get("selected_parameters")
         
-        all_parameters = []
         if variation_delta == 0 or not selected_parameters:
             if variation_delta == 0:
                  self.logger.info("Variation delta is 0. Using only base parameters.")
             else:
                  self.logger.info("No parameters selected for variation. Using only base parameters.")
-            # Assign a default sim_id if needed, or ensure it exists in base_parameter
-            if "SimNums" not in base_parameter or "sim_id" not in base_parameter.get("SimNums", {}):
-                 if "SimNums" not in base_parameter:
-                     base_parameter["SimNums"] = {}
-                 base_parameter["SimNums"]["sim_id"] = 1 # Assign default ID 1
-                 self.logger.warning("Assigning default sim_id=1 to base parameters.")
-            all_parameters = [base_parameter]
-        else:
-            self.logger.info(f"Generating parameter variations with delta={variation_delta} for parameters: {selected_parameters}")
-            parameters_variation = ParametersVariation(
-                base_parameters=base_parameter,
-                selected_parameters=selected_parameters,
-                variation_delta=variation_delta,
-            )
-            all_parameters = parameters_variation.generate_variations()
-            self.logger.info(f"Generated {len(all_parameters)} parameter sets.")
+            return self._pre_process_single(base_parameter)
+            
+        all_parameters = self._generate_all_parameters(
+            base_parameter, variation_delta, selected_parameters
+        )
         # --- End Conditional Variation ---
 
         if not all_parameters:
             self.logger.error("No parameter configurations were generated. Aborting pre-process.")
             raise ValueError("Parameter generation resulted in an empty list.")
 
-        generated_configs = []
-        for params in all_parameters:
+        # Extract the Fluid sections and their hashes up front, as parallel lists
+        pending_configs = [params for params in all_parameters if params.get("Fluid")]
+        if len(pending_configs) < len(all_parameters):
+            self.logger.warning(
+                f"Fluid parameters missing in {len(all_parameters) - len(pending_configs)} "
+                "configuration sets. Skipping them."
+            )
+        sim_infos = []
+        for params in pending_configs:
             # Generate simulation hash and staging folder from Fluid parameters
-            fluid_params = params.get("Fluid", {})
-            if not fluid_params:
-                 self.logger.warning("Fluid parameters missing in a configuration set. Skipping hash generation.")
-                 continue # Or handle error appropriately
-                 
-            sim_hash = generate_param_hash(fluid_params)
-            
-            # Ensure SimNums exists before accessing/setting
-            if "SimNums" not in params:
-                params["SimNums"] = {}
-                
-            params["SimNums"]["sim_hash"] = sim_hash
-            params["SimNums"]["staging_folder"] = f"staging_{sim_hash}"
-            sim_id = params["SimNums"].get("sim_id", "N/A") # Use get for safety
-
-            # Insert into database (handle potential errors)
-            try:
-                self.db.insert_simulation(sim_hash, sim_id, str(fluid_params))
-            except Exception as db_err:
-                 self.logger.error(f"Failed to insert simulation {sim_hash} into DB: {db_err}. Skipping this configuration.")
-                 continue # Skip if DB insert fails
+            info = self._sim_info(params)
+            params["SimNums"].update(sim_hash=info.sim_hash, staging_folder=info.staging_folder)
+            sim_infos.append(info)
 
-            # Generate .mat files (handle potential errors)
+        # Reuse staging folders of recorded simulations written from this same INI
+        marker = self._staging_marker()
+        existing_hashes = self.db.select_existing_hashes(info.sim_hash for info in sim_infos)
+        generated_configs = []
+        to_write = []
+        for params, info in zip(pending_configs, sim_infos):
+            if info.sim_hash in existing_hashes and self._is_staged(params, marker):
+                generated_configs.append(params)
+            else:
+                to_write.append((params, info))
+        if generated_configs:
+            self.logger.info(f"Reusing staging files of {len(generated_configs)} existing simulations.")
+
+        # Insert all new records into the database in one transaction
+        try:
+            self.db.insert_simulations(
+                (info.sim_hash, info.sim_id, _serialize_fluid(info.fluid)) for _, info in to_write
+            )
+        except Exception as db_err:
+            self.logger.error(f"Failed to insert simulations into DB: {db_err}. Aborting pre-process.")
+            raise
+
+        # Generate .mat files in worker processes; DB access stays in this process
+        failed_hashes = []
+        num_workers = self.config.get("num_threads", self.DEFAULT_NUM_THREADS)
+        if to_write:
+            with ProcessPoolExecutor(
+                max_workers=num_workers, initializer=_init_mat_files_worker
+            ) as executor:
+                results = executor.map(
+                    _write_mat_files,
+                    [params for params, _ in to_write],
+                    itertools.repeat(marker),
+                    chunksize=self.MAT_FILES_CHUNKSIZE,
+                )
+                for (params, info), mat_err in zip(to_write, results):
+                    if mat_err is None:
+                        self.logger.info("Generated .mat files for simulation %s (ID: %s)", info.sim_hash, info.sim_id)
+                        generated_configs.append(params) # Add only if successful
+                    else:
+                        self.logger.error(f"Failed to generate .mat files for {info.sim_hash}: {mat_err}. Skipping this configuration.")
+                        failed_hashes.append(info.sim_hash)
+
+        if failed_hashes:
             try:
-                mat_files = MatFiles(params)
-                mat_files.write()
-                self.logger.info(f"Generated .mat files for simulation {sim_hash} (ID: {sim_id})")
-                generated_configs.append(params) # Add only if successful
-            except Exception as mat_err:
-                self.logger.error(f"Failed to generate .mat files for {sim_hash}: {mat_err}. Skipping this configuration.")
-                # Optionally update DB status to FAILED here
-                try:
-                    self.db.update_sim_status(sim_hash, SimulationStatus.FAILED)
-                except Exception as db_update_err:
-                    self.logger.error(f"Failed to update status to FAILED for {sim_hash} after .mat error: {db_update_err}")
+                self.db.update_sim_status_many(failed_hashes, SimulationStatus.FAILED)
+            except Exception as db_update_err:
+                self.logger.error(f"Failed to update status to FAILED after .mat errors: {db_update_err}")
 
         self.configs = generated_configs # Store only successfully pre-processed configs
         if not self.configs:
@@ -239,141 +447,493 @@ class Pumle:
              
         return self.configs
 
-    def run_simulations(self) -> None:
-        """Execute the simulation process."""
+    def _generate_all_parameters(
+        self,
+        base_parameter: Dict[str, Dict[str, Any]],
+        variation_delta: float,
+        selected_parameters: List[str],
+    ) -> List[Dict]:
+        """Generate the parameter sets of a sweep, reusing a previous run's.
+        
+        The parameter combinations are cached by ParametersVariation in the
+        staging layer. The cache records the selected parameters in order,
+        their base values and the variation settings, so a changed setup
+        regenerates them instead of reusing another sweep's sim_ids.
+        
+        Args:
+            base_parameter: Base parameters loaded from the INI file
+            variation_delta: Relative variation range
+            selected_parameters: Parameters to vary
+            
+        Returns:
+            List of parameter sets
+        """
+        self.logger.info(f"Generating parameter variations with delta={variation_delta} for parameters: {selected_parameters}")
+        parameters_variation = ParametersVariation(
+            base_parameters=base_parameter,
+            selected_parameters=selected_parameters,
+            variation_delta=variation_delta,
+            cache_file=Path(self.data_lake["staging"]) / "parameter_combinations",
+        )
+        all_parameters = parameters_variation.generate_variations()
+        self.logger.info(f"Generated {len(all_parameters)} parameter sets.")
+        return all_parameters
+
+    @staticmethod
+    def _sim_info(params: Dict) -> SimInfo:
+        """Derive the identity of a configuration from its Fluid parameters.
+        
+        Args:
+            params: Configuration with a Fluid section
+            
+        Returns:
+            SimInfo of the configuration
+        """
+        fluid = params["Fluid"]
+        sim_hash = _hash_fluid(tuple(sorted(fluid.items())))
+        return SimInfo(
+            sim_hash=sim_hash,
+            sim_id=params.setdefault("SimNums", {}).get("sim_id", "N/A"),
+            staging_folder=f"staging_{sim_hash}",
+            fluid=fluid,
+        )
+
+    def _staging_marker(self) -> bytes:
+        """Identify the INI file that staging files are generated from.
+        
+        Only the Fluid parameters are part of the simulation hash, so the
+        marker ties a staging folder to the INI revision that produced its
+        other sections.
+        
+        Returns:
+            Content for the staging folders' marker files
+        """
+        ini_path = os.path.abspath(self.setup_ini)
+        return f"{ini_path}|{os.stat(ini_path).st_mtime_ns}".encode()
+
+    @staticmethod
+    def _is_staged(params: Dict, marker: bytes) -> bool:
+        """Check whether a configuration's staging files are already written.
+        
+        Args:
+            params: Configuration, with SimNums already filled in
+            marker: Expected marker content, from _staging_marker
+            
+        Returns:
+            True if the staging folder is complete and current
+        """
+        pumle_root = params.get("Paths", {}).get("PUMLE_ROOT")
+        if not pumle_root:
+            return False
+        return MatFiles.is_written(pumle_root, params["SimNums"]["staging_folder"], marker)
+
+    def _pre_process_single(self, params: Dict) -> List[Dict]:
+        """Pre-process the base parameters alone, without a variation sweep.
+        
+        The single configuration is hashed, inserted and written directly,
+        skipping the batching and worker pool used for sweeps.
+        
+        Args:
+            params: Base parameters loaded from the INI file
+            
+        Returns:
+            List with the configuration, or an empty list if it failed
+        """
+        # Assign a default sim_id if needed, or ensure it exists in base_parameter
+        sim_nums = params.setdefault("SimNums", {})
+        if "sim_id" not in sim_nums:
+            sim_nums["sim_id"] = 1 # Assign default ID 1
+            self.logger.warning("Assigning default sim_id=1 to base parameters.")
+            
+        fluid_params = params.get("Fluid")
+        if not fluid_params:
+            self.logger.error("Fluid parameters missing in the base parameters. No configuration was processed.")
+            self.configs = []
+            return self.configs
+            
+        info = self._sim_info(params)
+        sim_hash, sim_id = info.sim_hash, info.sim_id
+        sim_nums.update(sim_hash=sim_hash, staging_folder=info.staging_folder)
+        
+        marker = self._staging_marker()
+        if self._is_staged(params, marker) and self.db.get_sim_by_hash(sim_hash):
+            self.logger.info(f"Reusing staging files of existing simulation {sim_hash}")
+            self.configs = [params]
+            return self.configs
+            
+        self.db.insert_simulation(sim_hash, sim_id, _serialize_fluid(fluid_params))
+        
+        mat_err = _write_mat_files(params, marker)
+        if mat_err is None:
+            self.logger.info("Generated .mat files for simulation %s (ID: %s)", sim_hash, sim_id)
+            self.configs = [params]
+        else:
+            self.logger.error(f"Failed to generate .mat files for {sim_hash}: {mat_err}.")
+            self.db.update_sim_status(sim_hash, SimulationStatus.FAILED)
+            self.configs = []
+            
+        return self.configs
+
+    def run_simulations(self, on_complete: Optional[Callable[[str], None]] = None) -> None:
+        """Execute the simulation process.
+        
+        Args:
+            on_complete: Optional callback invoked with the hash of each
+                simulation as soon as its completion flag appears, while the
+                remaining simulations are still running
+        """
         if not self.configs:
             raise ValueError("No simulation configurations found. Run pre_process first.")
 
-        # Update database status
-        for params in self.configs:
-            sim_hash = params["SimNums"]["sim_hash"]
-            self.db.update_sim_status(sim_hash, "RUNNING")
+        sim_hashes = [params["SimNums"]["sim_hash"] for params in self.configs]
 
-        # Execute simulation script
+        # Start the simulation driver, then update the database while it runs
         num_threads = str(self.config.get("num_threads", self.DEFAULT_NUM_THREADS))
-        result = subprocess.run(
-            ["sh", "simulation_script.sh", num_threads],
-            check=True
+        process = subprocess.Popen(
+            [self._build_simulation_driver(), num_threads],
+            env={**os.environ, "OMP_NUM_THREADS": num_threads},
         )
+        try:
+            self.db.update_sim_status_many(sim_hashes, SimulationStatus.RUNNING)
+            if on_complete is not None:
+                self._watch_completions(process, on_complete)
+        except BaseException:
+            # Stop the driver rather than leaving it running unattended
+            self._stop_process(process)
+            try:
+                self.db.update_sim_status_many(sim_hashes, SimulationStatus.FAILED)
+            except Exception as db_err:
+                self.logger.error(f"Failed to update status to FAILED after an aborted run: {db_err}")
+            raise
+            
+        return_code = process.wait()
+        if return_code != 0:
+            self.db.update_sim_status_many(sim_hashes, SimulationStatus.FAILED)
+            raise subprocess.CalledProcessError(return_code, process.args)
 
         # Update database status
-        for params in self.configs:
-            sim_hash = params["SimNums"]["sim_hash"]
-            self.db.update_sim_status(sim_hash, "COMPLETED")
+        self.db.update_sim_status_many(sim_hashes, SimulationStatus.COMPLETED)
+
+    def _stop_process(self, process: subprocess.Popen) -> None:
+        """Terminate a process, killing it if it does not exit promptly.
+        
+        Args:
+            process: Process to stop
+        """
+        process.terminate()
+        try:
+            process.wait(timeout=self.PROCESS_TERMINATE_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
 
-    def post_process(self, sim_hash: str) -> List[Dict]:
+    def _build_simulation_driver(self) -> str:
+        """Compile the simulation driver if it is missing or out of date.
+        
+        Returns:
+            Path of the compiled driver
+            
+        Raises:
+            subprocess.CalledProcessError: If compilation fails
+        """
+        return build_simulation_driver(
+            self.SIMULATION_DRIVER_SOURCE,
+            self.SIMULATION_DRIVER_BINARY,
+            self.SIMULATION_DRIVER_FLAGS_FILE,
+        )
+
+    def _watch_completions(
+        self,
+        process: subprocess.Popen,
+        on_complete: Callable[[str], None]
+    ) -> None:
+        """Report simulations whose completion flag appears while they run.
+        
+        The simulation driver writes ``completed.flag`` into a staging folder
+        once its simulation has finished successfully.
+        
+        Args:
+            process: Running simulation script
+            on_complete: Callback invoked with each completed simulation hash
+        """
+        pending = {
+            os.path.join(
+                self.data_lake["staging"],
+                params["SimNums"]["staging_folder"],
+                MatFiles.COMPLETION_FLAG,
+            ): params["SimNums"]["sim_hash"]
+            for params in self.configs
+        }
+        while pending:
+            finished = process.poll() is not None
+            for flag_path in [path for path in pending if os.path.exists(path)]:
+                on_complete(pending.pop(flag_path))
+            if finished:
+                break
+            try:
+                process.wait(timeout=self.COMPLETION_POLL_INTERVAL)
+            except subprocess.TimeoutExpired:
+                pass
+
+    def run_and_persist(self) -> None:
+        """Run simulations and persist each one as soon as it completes.
+        
+        Post-processing and saving of finished simulations overlaps with the
+        simulations that are still running, instead of waiting for all of
+        them as run_simulations followed by post_process_and_save does.
+        """
+        with ThreadPoolExecutor(
+            max_workers=self.config.get("num_threads", self.DEFAULT_NUM_THREADS)
+        ) as executor:
+            futures = []
+            self.run_simulations(
+                on_complete=lambda sim_hash: futures.append(
+                    executor.submit(self.post_process_and_save, sim_hash)
+                )
+            )
+            for future in futures:
+                future.result()
+
+    def post_process(self, sim_hash: str) -> Iterator[Dict]:
         """Process simulation results.
         
+        States are parsed lazily, one timestep at a time.
+        
         Args:
             sim_hash: Unique identifier for the simulation
             
         Returns:
-            List of dictionaries containing processed results
+            Iterator of dictionaries containing processed results
         """
         parser = SimResultsParser(
             self.data_lake["bronze_data"], 
             sim_hash=sim_hash
         )
-        return parser.get_all()
+        return parser.iter_all()
 
-    def save_data(self, sim_hash: str, result: List[Dict]) -> None:
+    def post_process_and_save(self, sim_hash: str) -> None:
+        """Process simulation results and save them as golden data.
+        
+        States are stacked by the parser into one array per field, with
+        their shared metadata stored once, and consolidated in a single
+        vectorized step.
+        
+        Args:
+            sim_hash: Unique identifier for the simulation
+        """
+        parser = SimResultsParser(
+            self.data_lake["bronze_data"], 
+            sim_hash=sim_hash
+        )
+        self.save_data(sim_hash, parser.get_stacked())
+
+    def save_all(self, sim_hashes: Iterable[str]) -> None:
+        """Post-process and save several simulations concurrently.
+        
+        Saving is dominated by file and network I/O, so simulations are
+        handled by a thread pool; S3 uploads share a single client.
+        
+        Args:
+            sim_hashes: Unique identifiers of the simulations to save
+        """
+        sim_hashes = list(sim_hashes)
+        if not sim_hashes:
+            return
+        with ThreadPoolExecutor(max_workers=min(32, len(sim_hashes))) as executor:
+            futures = [
+                executor.submit(self.post_process_and_save, sim_hash)
+                for sim_hash in sim_hashes
+            ]
+            for future in futures:
+                future.result()
+
+    def _cloud_storage(self) -> CloudStorage:
+        """Get the cloud storage shared by all uploads of this instance.
+        
+        Returns:
+            CloudStorage created from the s3_config on first use
+            
+        Raises:
+            ValueError: If no s3_config is configured
+        """
+        with self._storage_lock:
+            if self._storage is None:
+                s3_config = self.config.get("s3_config")
+                if not s3_config:
+                    raise ValueError("s3_config required for S3 upload")
+                self._storage = CloudStorage(**s3_config)
+            return self._storage
+
+    def _array_config(self) -> ArrayConfig:
+        """Build the array saving configuration from the main config.
+        
+        Returns:
+            ArrayConfig instance
+        """
+        return ArrayConfig(
+            saving_method=self.config.get("saving_method", self.DEFAULT_SAVING_METHOD),
+            upload_to_s3=self.config.get("upload_to_s3", False),
+            s3_config=self.config.get("s3_config") if self.config.get("upload_to_s3") else None
+        )
+
+    @staticmethod
+    def _state_as_arrays(state: Dict) -> Dict:
+        """Convert the list values of a state to arrays.
+        
+        Args:
+            state: Processed state dictionary
+            
+        Returns:
+            State with lists replaced by arrays; existing arrays are kept as-is
+            
+        Raises:
+            TypeError: If the state is not a dictionary
+        """
+        if not isinstance(state, dict):
+            raise TypeError(f"Expected dict, got {type(state)}")
+        return {
+            key: np.asarray(value) if isinstance(value, list) else value
+            for key, value in state.items()
+        }
+
+    def save_data(self, sim_hash: str, result: Union[Iterable[Dict], Dict[str, Any]]) -> None:
         """Save simulation results.
         
         Args:
             sim_hash: Unique identifier for the simulation
-            result: List of dictionaries containing results to save
+            result: Dictionaries containing results to save, as a list or
+                an iterator such as the one returned by post_process; or
+                the stacked arrays returned by SimResultsParser.get_stacked
             
         Raises:
             ValueError: If result is empty or invalid
             TypeError: If result contains invalid data types
         """
-        if not result:
-            raise ValueError("Result list cannot be empty")
+        if isinstance(result, dict):
+            if not result.get("metadata", {}).get("n_states"):
+                raise ValueError("Result list cannot be empty")
+            states = result
+        elif isinstance(result, list):
+            if not result:
+                raise ValueError("Result list cannot be empty")
+            states = result
+        else:
+            states = iter(result)
+            first_state = next(states, None)
+            if first_state is None:
+                raise ValueError("Result list cannot be empty")
+            states = itertools.chain([first_state], states)
             
         try:
-            # Convert result to proper format if needed
-            processed_result = []
-            for state in result:
-                if not isinstance(state, dict):
-                    raise TypeError(f"Expected dict, got {type(state)}")
-                    
-                processed_state = {}
-                for key, value in state.items():
-                    if isinstance(value, (list, np.ndarray)):
-                        # Convert lists and numpy arrays to proper format
-                        processed_state[key] = np.array(value).tolist()
-                    else:
-                        processed_state[key] = value
-                        
-                processed_result.append(processed_state)
+            # Lists keep the vectorized consolidation; iterators are consumed lazily
+            if isinstance(states, dict):
+                processed_result = states
+            elif isinstance(states, list):
+                processed_result = [self._state_as_arrays(state) for state in states]
+            else:
+                processed_result = map(self._state_as_arrays, states)
             
             # Initialize Arrays object
             arrays_obj = Arrays(self.data_lake["golden_data"])
-            
-            # Create ArrayConfig instance from main config
-            array_config = ArrayConfig(
-                saving_method=self.config.get("saving_method", self.DEFAULT_SAVING_METHOD),
-                upload_to_s3=self.config.get("upload_to_s3", False),
-                s3_config=self.config.get("s3_config") if self.config.get("upload_to_s3") else None
-            )
 
             # Save the processed data using the ArrayConfig instance
+            array_config = self._array_config()
             arrays_obj.save_golden_data(
                 sim_id=sim_hash,
                 result=processed_result,
                 config=array_config, # Pass the correctly typed config object
+                storage=self._cloud_storage() if array_config.upload_to_s3 else None,
             )
             
-            self.logger.info(f"Successfully saved data for simulation {sim_hash}")
+            self.logger.info("Successfully saved data for simulation %s", sim_hash)
             
         except Exception as e:
             self.logger.error(f"Failed to save data for simulation {sim_hash}: {e}")
             raise
 
     def clean_older_files(self) -> None:
-        """Clean up old simulation files and staging folders."""
+        """Clean up old simulation files and staging folders.
+        
+        Every data lake layer is emptied in one pass, see exclude_layers.
+        """
         self.logger.info("Cleaning up old files...")
+        self.exclude_layers(self.data_lake)
+        self.logger.info("Cleanup completed.")
 
-        # Clean files within all specified data lake paths (excluding staging for folders)
-        for layer, path_str in self.data_lake.items():
-            if layer == "staging": # Skip staging folders in this specific file loop
+    def exclude_layers(self, layers: Iterable[str]) -> None:
+        """Remove previous data from several layers in a single pass.
+        
+        Each layer is renamed aside and recreated empty, then all renamed
+        trees are removed concurrently. Missing layers are created, so every
+        given layer exists and is empty afterwards.
+        
+        Args:
+            layers: Names of the data lake layers to clean; unknown names
+                are ignored
+        """
+        old_layers = []
+        for layer in layers:
+            path_str = self.data_lake.get(layer)
+            if not path_str:
                 continue
-            path = Path(path_str)
-            if path.exists() and path.is_dir():
-                self.logger.debug(f"Cleaning files in non-staging layer: {path}")
-                for item in path.iterdir():
-                    try:
-                        if item.is_file():
-                            item.unlink() # Remove file
-                            self.logger.debug(f"Removed file: {item}")
-                        # Optionally, you could add logic here to remove empty dirs in non-staging layers
-                    except Exception as e:
-                        self.logger.warning(f"Could not remove item {item} in {layer}: {e}")
-
-        # Specifically clean everything (files and folders) within the staging directory
-        staging_path_str = self.data_lake.get("staging")
-        if staging_path_str:
-            staging_path = Path(staging_path_str)
-            if staging_path.exists() and staging_path.is_dir():
-                self.logger.info(f"Cleaning all contents of staging directory: {staging_path}")
-                for item in staging_path.iterdir(): # Iterate through items directly in staging
-                    try:
-                        if item.is_dir():
-                            shutil.rmtree(item) # Recursively remove directory and contents
-                            self.logger.info(f"Removed staging directory: {item}")
-                        elif item.is_file():
-                            item.unlink() # Remove file
-                            self.logger.debug(f"Removed staging file: {item}")
-                    except Exception as e:
-                        self.logger.error(f"Failed to remove staging item {item}: {e}")
+            old_path = self._move_aside(layer, path_str)
+            if old_path:
+                old_layers.append((layer, old_path))
+            os.makedirs(path_str, exist_ok=True)
 
-        self.logger.info("Cleanup completed.")
+        if old_layers:
+            with ThreadPoolExecutor(max_workers=min(8, len(old_layers))) as executor:
+                list(executor.map(lambda item: self._remove_tree(*item), old_layers))
+
+    def _move_aside(self, layer: str, path: str) -> Optional[str]:
+        """Rename a layer directory to a hidden sibling, for later removal.
+        
+        A single rename detaches the whole tree, so the layer path is free
+        immediately. If the rename fails, the tree is removed in place.
+        
+        Args:
+            layer: Name of the data lake layer
+            path: Layer directory
+            
+        Returns:
+            Path of the renamed tree, or None if there is nothing left to remove
+        """
+        parent, name = os.path.split(os.path.normpath(path))
+        old_path = os.path.join(parent, f".{name}.old-{os.getpid()}")
+        try:
+            os.rename(path, old_path)
+            return old_path
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            self.logger.warning(f"Could not move {layer} layer aside, removing in place: {e}")
+            self._remove_tree(layer, path)
+            return None
+
+    def _remove_tree(self, layer: str, path: str) -> None:
+        """Remove a directory tree, logging instead of raising on failure.
+        
+        Args:
+            layer: Name of the data lake layer the tree belongs to
+            path: Directory to remove
+        """
+        try:
+            shutil.rmtree(path)
+            self.logger.info(f"Removed contents of {layer} layer")
+        except Exception as e:
+            self.logger.warning(f"Could not fully clean {layer} layer {path}: {e}")
 
     def create_data_lake(self) -> None:
         """Create data lake directory structure."""
         self.logger.info("Creating data lake directories")
-        for path in self.data_lake.values():
-            Path(path).mkdir(parents=True, exist_ok=True)
+        paths = list(self.data_lake.values())
+        if not paths:
+            return
+        # Overlap the stat/mkdir round trips, which matters on network storage
+        with ThreadPoolExecutor(max_workers=min(8, len(paths))) as executor:
+            list(executor.map(
+                lambda path: Path(path).mkdir(parents=True, exist_ok=True), paths
+            ))
 
     def exclude_previous_layers(self, layer: str) -> None:
         """Remove previous data from specified layer.
@@ -381,8 +941,7 @@ class Pumle:
         Args:
             layer: Name of the data lake layer to clean
         """
-        if os.path.exists(self.data_lake[layer]):
-            subprocess.run(["rm", "-rf", self.data_lake[layer]])
+        self.exclude_layers([layer])
 
     def save_tabular_data(self) -> None:
         """Save simulation results in tabular format."""
@@ -390,7 +949,10 @@ class Pumle:
             self.data_lake["golden_data"],
             self.data_lake["tabular_data"],
             self.config.get("saving_method", self.DEFAULT_SAVING_METHOD),
+            config=TabularConfig(
+                output_format=self.config.get("tabular_format", self.DEFAULT_TABULAR_FORMAT)
+            ),
         )
         tab.read_data()
-        tab.structute_data()
+        tab.structure_data()
         tab.save_data()
@@ -5,9 +5,13 @@ Handles parsing and processing of simulation output data.
 
 import logging
 import json
+import mmap
+import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Any, Optional, Union, List, Tuple, ClassVar
+from typing import Dict, Any, Iterator, Optional, Union, List, Tuple, ClassVar
 import numpy as np
+import orjson
 import pandas as pd
 from dataclasses import dataclass, field
 from functools import lru_cache
@@ -114,6 +118,7 @@ class SimResultsParser:
             
             self.results: Optional[SimulationResults] = None
             self.dimensions: Optional[Tuple[int, int, int]] = None
+            self._active_cells: Optional[Tuple[np.ndarray, np.ndarray]] = None
             
         except Exception as e:
             self.logger.error(f"Failed to initialize SimResultsParser: {e}")
@@ -153,12 +158,21 @@ class SimResultsParser:
             SimResultsParserError: If file reading fails
         """
         try:
+            # Required files were checked at init; open() reports any that
+            # disappeared since, without a second stat per file
             file_path = self.results_path / filename
-            if not file_path.exists():
-                raise FileNotFoundError(f"File not found: {file_path}")
-                
-            with open(file_path, 'r') as f:
-                return json.load(f)
+            with open(file_path, 'rb') as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    raise ValueError(f"Empty JSON file: {file_path}")
+                # Parse straight from the page cache, without a read buffer
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    with memoryview(mm) as content:
+                        try:
+                            return orjson.loads(content)
+                        except orjson.JSONDecodeError:
+                            # orjson is strict; fall back for non-standard
+                            # tokens like NaN
+                            return json.loads(bytes(content))
                 
         except Exception as e:
             self.logger.error(f"Failed to read JSON file {filename}: {e}")
@@ -203,21 +217,29 @@ class SimResultsParser:
         Raises:
             SimResultsParserError: If active cells cannot be read or are invalid
         """
+        if self._active_cells is not None:
+            return self._active_cells
+            
         try:
             grdecl_file = f"grdecl_{self.case_name}_{self.sim_hash}.json"
-            active_cells = np.array(self._read_json_file(grdecl_file))
+            mask = self._read_json_file(grdecl_file)
+            
+            # Decode the flat per-cell list straight into a bool mask,
+            # without an intermediate integer array
+            if isinstance(mask, list) and not any(isinstance(cell, list) for cell in mask[:1]):
+                active_cells = np.fromiter(mask, dtype=np.bool_, count=len(mask))
+            else:
+                active_cells = np.asarray(mask).astype(bool, copy=False)
             
             if active_cells.size == 0:
                 raise ValueError("Active cells array is empty")
                 
-            if not np.issubdtype(active_cells.dtype, np.bool_):
-                active_cells = active_cells.astype(bool)
-                
-            idx_to_get = np.where(active_cells)[0]
+            idx_to_get = np.flatnonzero(active_cells)
             if idx_to_get.size == 0:
                 raise ValueError("No active cells found")
                 
-            return active_cells, idx_to_get
+            self._active_cells = (active_cells, idx_to_get)
+            return self._active_cells
             
         except Exception as e:
             self.logger.error(f"Failed to get active cells: {e}")
@@ -257,11 +279,37 @@ class SimResultsParser:
             self.logger.error(f"Failed to get states for parameter {parameter}: {e}")
             raise SimResultsParserError(f"States reading failed: {e}")
 
-    def get_all(self) -> List[Dict[str, Any]]:
-        """Get all simulation data.
+    @staticmethod
+    def _fill_buffer(buffer: Optional[np.ndarray], values: List[Any]) -> np.ndarray:
+        """Copy a state's values into a float buffer, reusing it if it fits.
+        
+        JSON nulls become NaN.
         
+        Args:
+            buffer: Buffer from the previous state, or None
+            values: Flat list, or list of rows, of numbers
+            
         Returns:
-            List of dictionaries containing simulation data for each state
+            The filled buffer, newly allocated if the shape changed
+        """
+        if values and isinstance(values[0], list):
+            shape = (len(values), len(values[0]))
+        else:
+            shape = (len(values),)
+        if buffer is None or buffer.shape != shape:
+            buffer = np.empty(shape, dtype=np.float64)
+        buffer[...] = values
+        return buffer
+
+    def iter_all(self) -> Iterator[Dict[str, Any]]:
+        """Lazily yield the processed data of each state.
+        
+        Values are kept as NumPy arrays, so states can be streamed straight
+        into Arrays.save_golden_data without an intermediate list.
+        
+        Yields:
+            Dictionary containing simulation data for one state; its
+            metadata includes "n_states", the total number of states
             
         Raises:
             SimResultsParserError: If data cannot be read
@@ -277,12 +325,22 @@ class SimResultsParser:
             if not states:
                 raise ValueError("No states found in simulation results")
                 
+            # Values shared by every state, computed once
+            total_cells = int(np.prod(dimensions))
+            active_count = int(np.count_nonzero(active_cells))
+            timestamp = pd.Timestamp.now().isoformat()
+            num_states = len(states)
+            valid_indices = idx_to_get
+            valid_size = None
+            
+            # Full-size arrays are only needed until the active cells are
+            # gathered, so one buffer per field is reused across states
+            pressure = saturation = None
+            
             # Process each state
-            processed_states = []
             for state in states:
-                # Convert to numpy arrays for easier handling
-                pressure = np.array(state.get("pressure", []))
-                saturation = np.array(state.get("s", []))
+                pressure = self._fill_buffer(pressure, state.get("pressure", []))
+                saturation = self._fill_buffer(saturation, state.get("s", []))
                 
                 # Validate array sizes
                 if len(pressure) != len(saturation):
@@ -291,42 +349,109 @@ class SimResultsParser:
                 if len(pressure) < len(idx_to_get):
                     raise ValueError(f"State arrays ({len(pressure)}) smaller than active cells ({len(idx_to_get)})")
                 
-                # Only get data for valid indices
-                valid_indices = idx_to_get[idx_to_get < len(pressure)]
-                if len(valid_indices) < len(idx_to_get):
-                    self.logger.warning(
-                        f"Some active cell indices ({len(idx_to_get) - len(valid_indices)}) "
-                        f"are out of bounds for state arrays of size {len(pressure)}"
-                    )
+                # Only get data for valid indices; states normally share one
+                # size, so the bounds filter runs once
+                if len(pressure) != valid_size:
+                    valid_size = len(pressure)
+                    valid_indices = idx_to_get[idx_to_get < valid_size]
+                    if len(valid_indices) < len(idx_to_get):
+                        self.logger.warning(
+                            f"Some active cell indices ({len(idx_to_get) - len(valid_indices)}) "
+                            f"are out of bounds for state arrays of size {valid_size}"
+                        )
                 
                 # Get data only for valid indices
-                pressure_data = pressure[valid_indices]
-                saturation_data = saturation[valid_indices]
-                
-                processed_state = {
-                    "pressure": pressure_data.tolist(),
-                    "saturation": saturation_data.tolist(),
+                yield {
+                    "pressure": pressure[valid_indices],
+                    "saturation": saturation[valid_indices],
                     "metadata": {
                         "case_name": self.case_name,
                         "sim_hash": self.sim_hash,
                         "dimensions": dimensions,
-                        "total_cells": np.prod(dimensions),
-                        "active_cells": int(np.sum(active_cells)),
-                        "active_cell_indices": valid_indices.tolist(),
-                        "timestamp": pd.Timestamp.now().isoformat()
+                        "total_cells": total_cells,
+                        "active_cells": active_count,
+                        "active_cell_indices": valid_indices,
+                        "timestamp": timestamp,
+                        "n_states": num_states
                     }
                 }
-                processed_states.append(processed_state)
             
             self.logger.info(
                 f"Successfully retrieved all simulation data for case {self.case_name}"
             )
-            return processed_states
             
         except Exception as e:
             self.logger.error(f"Failed to get all simulation data: {e}")
             raise SimResultsParserError(f"Simulation data retrieval failed: {e}")
 
+    def get_stacked(self) -> Dict[str, Any]:
+        """Get all simulation data as one set of stacked arrays.
+        
+        States share their active cells and metadata, so instead of one
+        dictionary per state the values are stacked along a leading state
+        axis and the metadata is stored once.
+        
+        Returns:
+            Dictionary with "pressure" of shape (n_states, n_active),
+            "saturation" of shape (n_states, n_active, n_phases) and the
+            shared "metadata", which also holds "n_states"
+            
+        Raises:
+            SimResultsParserError: If data cannot be read or states do not
+                share their active cells
+        """
+        try:
+            pressure = saturation = metadata = None
+            for t, state in enumerate(self.iter_all()):
+                if metadata is None:
+                    # Every state's metadata carries the number of states
+                    metadata = dict(state["metadata"])
+                    num_states = metadata["n_states"]
+                    pressure = np.empty((num_states,) + state["pressure"].shape)
+                    saturation = np.empty((num_states,) + state["saturation"].shape)
+                else:
+                    indices = state["metadata"]["active_cell_indices"]
+                    if indices is not metadata["active_cell_indices"] and not np.array_equal(
+                        indices, metadata["active_cell_indices"]
+                    ):
+                        raise ValueError(f"State {t} has different active cells and cannot be stacked")
+                pressure[t] = state["pressure"]
+                saturation[t] = state["saturation"]
+                
+            return {"pressure": pressure, "saturation": saturation, "metadata": metadata}
+            
+        except SimResultsParserError:
+            raise
+        except Exception as e:
+            self.logger.error(f"Failed to stack simulation data: {e}")
+            raise SimResultsParserError(f"Simulation data stacking failed: {e}")
+
+    def get_all(self) -> List[Dict[str, Any]]:
+        """Get all simulation data.
+        
+        Returns:
+            List of dictionaries containing simulation data for each state,
+            with arrays converted to lists
+            
+        Raises:
+            SimResultsParserError: If data cannot be read
+        """
+        return [convert_ndarray(state) for state in self._iter_records()]
+
+    def _iter_records(self) -> Iterator[Dict[str, Any]]:
+        """Yield states in the saved record format.
+        
+        The "n_states" count is only needed while streaming, so it is left
+        out of records returned by get_all and written by save_all.
+        
+        Yields:
+            Dictionary containing simulation data for one state
+        """
+        for state in self.iter_all():
+            metadata = dict(state["metadata"])
+            metadata.pop("n_states", None)
+            yield dict(state, metadata=metadata)
+
     def save_all(self, output_path: Union[str, Path]) -> None:
         """Save all simulation data to JSON files.
         
@@ -340,17 +465,53 @@ class SimResultsParser:
             output_path = Path(output_path)
             output_path.mkdir(parents=True, exist_ok=True)
             
-            data = self.get_all()
             output_file = output_path / f"{self.case_name}_{self.sim_hash}.json"
             
-            # Convert NumPy arrays to lists for JSON serialization
-            data = convert_ndarray(data)
-            
-            with open(output_file, 'w') as f:
-                json.dump(data, f, indent=2)
+            # orjson serializes the NumPy arrays directly, without list copies;
+            # compact output is smaller and faster to write than indented
+            payload = orjson.dumps(
+                list(self._iter_records()),
+                option=orjson.OPT_SERIALIZE_NUMPY
+            )
+            with open(output_file, 'wb') as f:
+                f.write(payload)
                 
-            self.logger.info(f"Successfully saved data to {output_file}")
+            self.logger.info("Successfully saved data to %s", output_file)
             
         except Exception as e:
             self.logger.error(f"Failed to save simulation data: {e}")
             raise SimResultsParserError(f"Data saving failed: {e}")
+
+    @classmethod
+    def save_many(
+        cls,
+        results_path: Union[str, Path],
+        sim_hashes: List[str],
+        output_path: Union[str, Path],
+        case_name: str = "GCS01",
+        max_workers: Optional[int] = None
+    ) -> None:
+        """Save the data of several simulations concurrently.
+        
+        Each simulation's files are read, parsed and written independently,
+        so they are handled by a thread pool to overlap their I/O.
+        
+        Args:
+            results_path: Path to results directory
+            sim_hashes: Simulation hash identifiers
+            output_path: Path to save the data
+            case_name: Name of the simulation case (default: "GCS01")
+            max_workers: Maximum number of threads (default: CPU count)
+            
+        Raises:
+            SimResultsParserError: If any simulation fails to parse or save
+        """
+        if not sim_hashes:
+            return
+        max_workers = max_workers or min(len(sim_hashes), os.cpu_count() or 1)
+        
+        def save_one(sim_hash: str) -> None:
+            cls(results_path, sim_hash, case_name).save_all(output_path)
+            
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            list(executor.map(save_one, sim_hashes))
@@ -4,8 +4,10 @@ Manages reading, structuring, and saving simulation data in various formats.
 """
 
 import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional, Union, Literal, Dict, Any
+from typing import Optional, Union, Literal, Dict, Any, Tuple
 import numpy as np
 import pandas as pd
 import zarr
@@ -16,7 +18,11 @@ from dataclasses import dataclass
 class TabularConfig:
     """Configuration for tabular data operations."""
     default_attr: str = "sg"
-    supported_structures: tuple = ("zarr", "numpy", None)
+    supported_structures: tuple = ("zarr", "numpy", "coo", None)
+    # Saturations fit float32; use "float64" for attributes needing more precision
+    value_dtype: str = "float32"
+    # "csv" or "parquet"; parquet needs pyarrow or fastparquet installed
+    output_format: str = "csv"
 
 
 class TabularError(Exception):
@@ -24,6 +30,76 @@ class TabularError(Exception):
     pass
 
 
+# Columns of the sparse (COO) layout, one entry per nonzero cell
+COO_COLUMNS = ("simulation", "timestamp", "x", "y", "z", "values")
+
+
+def _index_dtype(size: int) -> np.dtype:
+    """Get the smallest signed integer type indexing an axis of this size."""
+    return np.dtype(np.int16 if size <= np.iinfo(np.int16).max else np.int32)
+
+
+def _coo_columns(
+    data: np.ndarray,
+    value_dtype: Union[str, np.dtype] = "float32",
+    max_workers: Optional[int] = None
+) -> Dict[str, np.ndarray]:
+    """Extract the nonzero cells of a 5-D (x, y, z, time, simulation) array.
+    
+    Index columns use the narrowest integer type fitting their axis, which
+    keeps the columns compact in memory and on disk. With several
+    simulations and CPUs, each simulation's block is scanned on its own
+    thread; NumPy releases the GIL while scanning and gathering.
+    
+    Args:
+        data: Dense array indexed as (x, y, z, timestep, simulation)
+        value_dtype: Type of the values column
+        max_workers: Maximum number of scanning threads (default: CPU count)
+        
+    Returns:
+        Dictionary of COO_COLUMNS arrays, ordered by simulation, then
+        timestep, then cell
+    """
+    # Viewing the array with the simulation and time axes first yields
+    # rows grouped by simulation, then timestep, then cell
+    by_sim_and_time = np.moveaxis(data, (4, 3), (0, 1))
+    dtypes = [_index_dtype(size) for size in by_sim_and_time.shape]
+    num_sims = by_sim_and_time.shape[0]
+    workers = min(num_sims, max_workers or os.cpu_count() or 1)
+    
+    if workers <= 1:
+        # One nonzero scan over the whole array
+        indices = np.nonzero(by_sim_and_time)
+        columns = {
+            name: index.astype(dtype, copy=False)
+            for name, index, dtype in zip(COO_COLUMNS, indices, dtypes)
+        }
+        columns["values"] = by_sim_and_time[indices].astype(value_dtype, copy=False)
+        return columns
+        
+    def scan(sim_id: int) -> Tuple[Tuple[np.ndarray, ...], np.ndarray]:
+        block = by_sim_and_time[sim_id]
+        indices = np.nonzero(block)
+        return indices, block[indices]
+        
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        blocks = list(executor.map(scan, range(num_sims)))
+        
+    # Copy each block into its slice of the preallocated columns
+    total = sum(values.size for _, values in blocks)
+    columns = {name: np.empty(total, dtype=dtype) for name, dtype in zip(COO_COLUMNS, dtypes)}
+    columns["values"] = np.empty(total, dtype=value_dtype)
+    start = 0
+    for sim_id, (indices, values) in enumerate(blocks):
+        stop = start + values.size
+        columns["simulation"][start:stop] = sim_id
+        for name, index in zip(COO_COLUMNS[1:], indices):
+            columns[name][start:stop] = index
+        columns["values"][start:stop] = values
+        start = stop
+    return columns
+
+
 class Tabular:
     """Handles tabular data operations for simulation results.
     
@@ -35,7 +111,7 @@ class Tabular:
         self,
         input_data_path: Union[str, Path],
         output_data_path: Union[str, Path],
-        input_structure: Optional[Literal["zarr", "numpy"]] = None,
+        input_structure: Optional[Literal["zarr", "numpy", "coo"]] = None,
         attr: str = "sg",
         config: Optional[TabularConfig] = None
     ) -> None:
@@ -44,7 +120,8 @@ class Tabular:
         Args:
             input_data_path: Path to input data directory
             output_data_path: Path to output data directory
-            input_structure: Input data structure type ("zarr" or "numpy")
+            input_structure: Input data structure type ("zarr", "numpy" or
+                "coo" for the sparse layout written by save_coo)
             attr: Attribute name for data files
             config: Optional configuration
             
@@ -59,7 +136,7 @@ class Tabular:
             self.output_data_path = Path(output_data_path)
             self.input_structure = input_structure
             self.attr = attr or self.config.default_attr
-            self.data: Optional[Union[np.ndarray, pd.DataFrame]] = None
+            self.data: Optional[Union[np.ndarray, Dict[str, np.ndarray], pd.DataFrame]] = None
             
             # Validate input structure
             if self.input_structure not in self.config.supported_structures:
@@ -84,6 +161,9 @@ class Tabular:
                 data = zarr.open(str(file_path.with_suffix(".zarr")), mode="r")
             elif self.input_structure == "numpy" or self.input_structure is None:
                 data = np.load(str(file_path.with_suffix(".npy")))
+            elif self.input_structure == "coo":
+                with np.load(str(file_path.with_suffix(".npz"))) as coo:
+                    data = {name: coo[name] for name in COO_COLUMNS}
             else:
                 raise ValueError(f"Unsupported input structure: {self.input_structure}")
                 
@@ -107,42 +187,54 @@ class Tabular:
             raise TabularError("No data loaded. Call read_data() first.")
             
         try:
-            if not isinstance(self.data, np.ndarray):
-                raise ValueError("Data must be a numpy array for structuring")
+            if isinstance(self.data, dict):
+                # Sparse input already holds one entry per nonzero cell
+                columns = self.data
+            elif isinstance(self.data, np.ndarray):
+                columns = _coo_columns(self.data, self.config.value_dtype)
+            else:
+                raise ValueError("Data must be a numpy array or COO columns for structuring")
                 
-            first_iteration = True
-            number_of_simulations = self.data.shape[4]
-            number_of_times = self.data.shape[3]
-            
-            for sim_id in range(number_of_simulations):
-                for i in range(number_of_times):
-                    x, y, z = self.data[:, :, :, i, sim_id].nonzero()
-                    values = self.data[x, y, z, i, sim_id]
-                    
-                    data_df = {
-                        "simulation": sim_id,
-                        "timestamp": i,
-                        "x": x,
-                        "y": y,
-                        "z": z,
-                        "values": values,
-                    }
-                    
-                    if first_iteration:
-                        df = pd.DataFrame(data_df)
-                        first_iteration = False
-                    else:
-                        df = pd.concat([df, pd.DataFrame(data_df)], ignore_index=True)
-                        
-            self.data = df
+            # The column arrays are freshly built, so the DataFrame can own
+            # them instead of copying them into consolidated blocks
+            self.data = pd.DataFrame(columns, copy=False)
             self.logger.info("Successfully structured data into DataFrame")
             
         except Exception as e:
             self.logger.error(f"Failed to structure data: {e}")
             raise TabularError(f"Data structuring failed: {e}")
 
+    def save_coo(self, data: np.ndarray) -> Path:
+        """Save a dense 5-D array in the sparse layout read with "coo".
+        
+        Only nonzero cells are stored, so reading them back streams no
+        zeros and needs no nonzero scan.
+        
+        Args:
+            data: Dense array indexed as (x, y, z, timestep, simulation)
+            
+        Returns:
+            Path of the written ``.npz`` file
+            
+        Raises:
+            TabularError: If saving fails
+        """
+        try:
+            self.input_data_path.mkdir(parents=True, exist_ok=True)
+            output_file = self.input_data_path / f"{self.attr}.npz"
+            np.savez(output_file, **_coo_columns(np.asarray(data), self.config.value_dtype))
+            self.logger.info("Saved sparse data to %s", output_file)
+            return output_file
+        except Exception as e:
+            self.logger.error(f"Failed to save sparse data: {e}")
+            raise TabularError(f"Sparse data saving failed: {e}")
+
     def save_data(self) -> None:
-        """Save structured data to CSV file.
+        """Save structured data to a CSV or Parquet file.
+        
+        The format is selected by TabularConfig.output_format. Parquet is
+        binary, columnar and Snappy-compressed, so it is much smaller and
+        faster to write and read than CSV.
         
         Raises:
             TabularError: If data is not structured or saving fails
@@ -157,9 +249,15 @@ class Tabular:
             # Ensure output directory exists
             self.output_data_path.mkdir(parents=True, exist_ok=True)
             
-            # Save to CSV
-            output_file = self.output_data_path / f"{self.attr}.csv"
-            self.data.to_csv(output_file, index=False)
+            output_format = self.config.output_format.strip().lower()
+            if output_format == "parquet":
+                output_file = self.output_data_path / f"{self.attr}.parquet"
+                self.data.to_parquet(output_file, compression="snappy", index=False)
+            elif output_format == "csv":
+                output_file = self.output_data_path / f"{self.attr}.csv"
+                self.data.to_csv(output_file, index=False)
+            else:
+                raise ValueError(f"Unsupported output format: {self.config.output_format}")
             self.logger.info(f"Successfully saved data to {output_file}")
             
         except Exception as e:
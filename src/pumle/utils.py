@@ -6,11 +6,24 @@ Provides common functionality for data handling and processing.
 import json
 import hashlib
 import logging
+import re
 from pathlib import Path
-from typing import Any, Dict, List, Union, Optional
+from typing import Any, Dict, List, Tuple, Union, Optional
 from dataclasses import dataclass
 
 import numpy as np
+import orjson
+
+# Optional non-cryptographic hashes, selectable through HashConfig
+try:
+    import blake3
+except ImportError:
+    blake3 = None
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
 
 
 @dataclass
@@ -18,6 +31,9 @@ class HashConfig:
     """Configuration for hash generation."""
     hash_length: int = 8
     encoding: str = "utf-8"
+    # Any hashlib algorithm, or "blake3"/"xxh64" when those packages are
+    # installed. Changing it changes every simulation hash, so existing
+    # database entries and staging folders would no longer be matched.
     hash_algorithm: str = "md5"
 
 
@@ -26,6 +42,23 @@ class UtilsError(Exception):
     pass
 
 
+# Reused by generate_param_hash; json.dumps builds a new encoder per call
+# whenever a non-default option such as sort_keys is passed
+_PARAM_ENCODER = json.JSONEncoder(sort_keys=True)
+
+# Direct constructors skip hashlib.new's lookup by algorithm name
+_HASH_CONSTRUCTORS = {
+    "md5": hashlib.md5,
+    "sha1": hashlib.sha1,
+    "sha256": hashlib.sha256,
+    "blake2b": hashlib.blake2b,
+}
+
+
+# Leaf types convert_ndarray leaves untouched
+_PLAIN_TYPES = frozenset((str, int, float, bool, type(None)))
+
+
 def setup_logger(name: str = "pumle.utils", level: int = logging.DEBUG) -> logging.Logger:
     """Configure and return a logger instance.
     
@@ -49,6 +82,10 @@ def setup_logger(name: str = "pumle.utils", level: int = logging.DEBUG) -> loggi
     return logger
 
 
+# Configured once at import; the helpers below are called in hot loops
+_logger = setup_logger()
+
+
 def generate_param_hash(
     params_dict: Dict[str, Any],
     config: Optional[HashConfig] = None
@@ -65,27 +102,65 @@ def generate_param_hash(
     Raises:
         UtilsError: If hash generation fails
     """
-    logger = setup_logger()
     config = config or HashConfig()
     
     try:
         # Ensure consistent key ordering
-        param_str = json.dumps(params_dict, sort_keys=True)
-        hash_obj = hashlib.new(
-            config.hash_algorithm,
-            param_str.encode(config.encoding)
-        )
+        param_bytes = _PARAM_ENCODER.encode(params_dict).encode(config.encoding)
+        if config.hash_algorithm == "blake3":
+            if blake3 is None:
+                raise ImportError("blake3 hashing requires the blake3 package")
+            hash_obj = blake3.blake3(param_bytes)
+        elif config.hash_algorithm == "xxh64":
+            if xxhash is None:
+                raise ImportError("xxh64 hashing requires the xxhash package")
+            hash_obj = xxhash.xxh64(param_bytes)
+        elif config.hash_algorithm in _HASH_CONSTRUCTORS:
+            hash_obj = _HASH_CONSTRUCTORS[config.hash_algorithm](param_bytes)
+        else:
+            hash_obj = hashlib.new(config.hash_algorithm, param_bytes)
         return hash_obj.hexdigest()[:config.hash_length]
     except Exception as e:
-        logger.error(f"Failed to generate parameter hash: {e}")
+        _logger.error(f"Failed to generate parameter hash: {e}")
         raise UtilsError(f"Hash generation failed: {e}")
 
 
+def _convert_shallow(obj: Any) -> Tuple[Any, bool]:
+    """Convert one node of the tree walked by convert_ndarray.
+    
+    Returns:
+        The converted node, and whether it is a new empty container still
+        to be filled from the original's children
+    """
+    # Exact type checks first; isinstance only for subclasses
+    obj_type = type(obj)
+    if obj_type in _PLAIN_TYPES:
+        return obj, False
+    if obj_type is np.ndarray or isinstance(obj, np.ndarray):
+        return obj.tolist(), False
+    if obj_type is dict or isinstance(obj, dict):
+        if all(type(v) in _PLAIN_TYPES for v in obj.values()):
+            return obj, False
+        return {}, True
+    if obj_type is list or isinstance(obj, list):
+        if all(type(i) in _PLAIN_TYPES for i in obj):
+            return obj, False
+        return [None] * len(obj), True
+    if isinstance(obj, np.generic):
+        return obj.item(), False
+    return obj, False
+
+
 def convert_ndarray(
     obj: Union[np.ndarray, Dict, List, Any]
 ) -> Union[List, Dict, Any]:
     """Convert numpy arrays to lists recursively.
     
+    NumPy scalars become Python scalars. Containers holding only plain
+    scalars are returned as they are rather than copied. Nested containers
+    are walked with an explicit stack, so deep trees neither pay a call per
+    node nor hit the recursion limit.
+    
     Args:
         obj: Object to convert (numpy array, dict, list, or other)
         
@@ -95,21 +170,37 @@ def convert_ndarray(
     Raises:
         UtilsError: If conversion fails
     """
-    logger = setup_logger()
-    
     try:
-        if isinstance(obj, np.ndarray):
-            return obj.tolist()
-        elif isinstance(obj, dict):
-            return {k: convert_ndarray(v) for k, v in obj.items()}
-        elif isinstance(obj, list):
-            return [convert_ndarray(i) for i in obj]
-        return obj
+        result, needs_fill = _convert_shallow(obj)
+        stack = [(obj, result)] if needs_fill else []
+        while stack:
+            source, target = stack.pop()
+            items = source.items() if type(target) is dict else enumerate(source)
+            for key, value in items:
+                converted, child_needs_fill = _convert_shallow(value)
+                target[key] = converted
+                if child_needs_fill:
+                    stack.append((value, converted))
+        return result
     except Exception as e:
-        logger.error(f"Failed to convert numpy array: {e}")
+        _logger.error(f"Failed to convert numpy array: {e}")
         raise UtilsError(f"Array conversion failed: {e}")
 
 
+def _json_default(obj: Any) -> Any:
+    """Convert NumPy objects the json module cannot serialize."""
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _is_utf8(encoding: str) -> bool:
+    """Check whether an encoding name refers to UTF-8, which orjson requires."""
+    return encoding.lower().replace("-", "").replace("_", "") == "utf8"
+
+
 def read_json(
     json_path: Union[str, Path],
     encoding: str = "utf-8"
@@ -126,20 +217,26 @@ def read_json(
     Raises:
         UtilsError: If file reading fails
     """
-    logger = setup_logger()
-    json_path = Path(json_path)
+    if not isinstance(json_path, Path):
+        json_path = Path(json_path)
     
     try:
-        if not json_path.exists():
-            raise FileNotFoundError(f"JSON file not found: {json_path}")
-            
-        with open(json_path, "r", encoding=encoding) as file:
-            return json.load(file)
+        # A missing file raises FileNotFoundError from the read itself,
+        # without a separate stat beforehand. One read of the whole file;
+        # the parsers work on the full buffer
+        content = json_path.read_bytes()
+        if _is_utf8(encoding):
+            try:
+                return orjson.loads(content)
+            except orjson.JSONDecodeError:
+                # orjson is strict; fall back for non-standard tokens like NaN
+                return json.loads(content)
+        return json.loads(content.decode(encoding))
     except json.JSONDecodeError as e:
-        logger.error(f"Invalid JSON in file {json_path}: {e}")
+        _logger.error(f"Invalid JSON in file {json_path}: {e}")
         raise UtilsError(f"Invalid JSON format: {e}")
     except Exception as e:
-        logger.error(f"Failed to read JSON file {json_path}: {e}")
+        _logger.error(f"Failed to read JSON file {json_path}: {e}")
         raise UtilsError(f"JSON file reading failed: {e}")
 
 
@@ -147,10 +244,14 @@ def write_json(
     json_path: Union[str, Path],
     data: Dict[str, Any],
     encoding: str = "utf-8",
-    indent: int = 4
+    indent: Optional[int] = 2
 ) -> None:
     """Write data to JSON file.
     
+    UTF-8 output with an indent of 2 or None is written by orjson, which
+    serializes NumPy arrays and scalars directly; other settings go through
+    the standard json module, converting arrays to lists as it goes.
+    
     Args:
         json_path: Path to write JSON file
         data: Data to write
@@ -160,19 +261,25 @@ def write_json(
     Raises:
         UtilsError: If file writing fails
     """
-    logger = setup_logger()
     json_path = Path(json_path)
     
     try:
         # Ensure parent directory exists
         json_path.parent.mkdir(parents=True, exist_ok=True)
         
-        processed_data = convert_ndarray(data)  # Ensure numpy arrays are converted
-        with open(json_path, "w", encoding=encoding) as file:
-            json.dump(processed_data, file, indent=indent)
-        logger.debug(f"Successfully wrote JSON file: {json_path}")
+        if _is_utf8(encoding) and indent in (2, None):
+            option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+            if indent:
+                option |= orjson.OPT_INDENT_2
+            json_path.write_bytes(orjson.dumps(data, option=option))
+        else:
+            # Arrays are converted as the encoder reaches them, without a
+            # converted copy of the tree; serialize first, then write once
+            payload = json.dumps(data, indent=indent, default=_json_default)
+            json_path.write_text(payload, encoding=encoding)
+        _logger.debug("Successfully wrote JSON file: %s", json_path)
     except Exception as e:
-        logger.error(f"Failed to write JSON file {json_path}: {e}")
+        _logger.error(f"Failed to write JSON file {json_path}: {e}")
         raise UtilsError(f"JSON file writing failed: {e}")
 
 
@@ -197,12 +304,19 @@ def validate_path(path: Union[str, Path]) -> Path:
         raise UtilsError(f"Path validation failed: {e}")
 
 
+# Character mappings used by params_to_filename_string
+_FLOAT_TRANSLATION = str.maketrans({".": "p", "+": None, "-": "m"})
+_SEPARATOR_TRANSLATION = str.maketrans({" ": "_", "/": "-"})
+_UNSAFE_CHARS = re.compile(r"[^A-Za-z0-9_-]+")
+
+
 def params_to_filename_string(params_dict: Dict[str, Any], max_length: int = 100) -> str:
     """Converts a dictionary of parameters into a concise, filename-safe string.
     
     Args:
         params_dict: Dictionary of parameters (e.g., fluid parameters).
-        max_length: Approximate maximum length for the resulting string.
+        max_length: Maximum length for the resulting string. Longer strings
+            are cut and end with a short hash of the full string.
         
     Returns:
         A string suitable for use in filenames.
@@ -212,31 +326,32 @@ def params_to_filename_string(params_dict: Dict[str, Any], max_length: int = 100
 
     parts = []
     # Sort keys for consistent filenames
-    sorted_keys = sorted(params_dict.keys())
-    
-    current_length = 0
-    for key in sorted_keys:
+    for key in sorted(params_dict.keys()):
         value = params_dict[key]
         # Format value to be filename-safe
         if isinstance(value, float):
             # Use scientific notation for floats, replace '.' with 'p', '+' with '', '-' with 'm'
-            val_str = f"{value:.2e}".replace('.', 'p').replace('+', '').replace('-', 'm')
+            val_str = f"{value:.2e}".translate(_FLOAT_TRANSLATION)
         else:
             # Convert other types to string, remove/replace unsafe chars
-            val_str = str(value).replace(" ", "_").replace("/", "-")
+            val_str = str(value).translate(_SEPARATOR_TRANSLATION)
             # Basic sanitation for other potential unsafe characters
-            val_str = ''.join(c for c in val_str if c.isalnum() or c in ['_', '-'])
-
-        part = f"{key}_{val_str}"
-        
-        # Check length before adding
-        if current_length + len(part) + 1 > max_length and len(parts) > 0:
-            break # Stop adding parts if exceeding max length (ensure at least one part)
-            
-        parts.append(part)
-        current_length += len(part) + 1 # +1 for the underscore separator
+            if val_str.isascii():
+                val_str = _UNSAFE_CHARS.sub("", val_str)
+            else:
+                # Keep non-ASCII letters and digits, as str.isalnum does
+                val_str = ''.join(c for c in val_str if c.isalnum() or c in "_-")
+        parts.append(f"{key}_{val_str}")
 
     if not parts:
         return "no_params"
         
-    return "_".join(parts)
+    full = "_".join(parts)
+    if len(full) <= max_length:
+        return full
+        
+    # Truncated names of sets differing only in later parameters would
+    # collide; a digest of the full string keeps them apart
+    suffix = hashlib.blake2b(full.encode("utf-8"), digest_size=3).hexdigest()
+    prefix = full[:max(0, max_length - len(suffix) - 1)].rstrip("_")
+    return f"{prefix}_{suffix}" if prefix else suffix